@@ -0,0 +1,61 @@
+"""Baseline schema (string UUID keys): users, posts and follows as the original app created them.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+uuid_str = sa.String(36)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", uuid_str, primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("display_name", sa.String(200), nullable=True),
+        sa.Column("bio", sa.String(500), nullable=True),
+        sa.Column("avatar_url", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "posts",
+        sa.Column("id", uuid_str, primary_key=True),
+        sa.Column("author_id", uuid_str, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(300), nullable=False),
+        sa.Column("slug", sa.String(350), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("body_format", sa.String(20), nullable=True),
+        sa.Column("cover_image_url", sa.String(500), nullable=True),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_posts_slug", "posts", ["slug"], unique=True)
+
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", uuid_str, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("following_id", uuid_str, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("follower_id", "following_id", name="uq_follow"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("follows")
+    op.drop_table("posts")
+    op.drop_table("users")
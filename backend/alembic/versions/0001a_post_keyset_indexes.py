@@ -0,0 +1,22 @@
+"""Composite indexes for keyset pagination of post listings.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0001a"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_posts_published_at_id", "posts", ["published_at", "id"])
+    op.create_index("ix_posts_author_published_at_id", "posts", ["author_id", "published_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_author_published_at_id", table_name="posts")
+    op.drop_index("ix_posts_published_at_id", table_name="posts")
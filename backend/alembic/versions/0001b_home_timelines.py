@@ -0,0 +1,43 @@
+"""Materialized home timelines and the fan-out-on-read author list.
+
+Revision ID: 0001b
+Revises: 0001a
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001b"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+uuid_str = sa.String(36)
+
+
+def upgrade() -> None:
+    # Left empty: `python -m app.cli backfill-timelines` builds them from the follow graph.
+    op.create_index("ix_follows_following_id", "follows", ["following_id"])
+
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", uuid_str, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("post_id", uuid_str, sa.ForeignKey("posts.id"), primary_key=True),
+        sa.Column("author_id", uuid_str, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("published_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_timeline_user_published_at_post", "timeline_entries", ["user_id", "published_at", "post_id"]
+    )
+    op.create_index("ix_timeline_post", "timeline_entries", ["post_id"])
+
+    op.create_table(
+        "fanout_on_read_authors",
+        sa.Column("author_id", uuid_str, sa.ForeignKey("users.id"), primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fanout_on_read_authors")
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_following_id", table_name="follows")
@@ -0,0 +1,26 @@
+"""Post summary columns (excerpt, word count, reading time) for body-free listings.
+
+Revision ID: 0001c
+Revises: 0001b
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001c"
+down_revision = "0001b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left empty: `python -m app.cli backfill-summaries` fills existing rows.
+    op.add_column("posts", sa.Column("excerpt", sa.String(500), nullable=True))
+    op.add_column("posts", sa.Column("word_count", sa.Integer(), nullable=True))
+    op.add_column("posts", sa.Column("reading_time", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "reading_time")
+    op.drop_column("posts", "word_count")
+    op.drop_column("posts", "excerpt")
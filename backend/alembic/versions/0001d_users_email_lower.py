@@ -0,0 +1,22 @@
+"""Unique functional index on lower(email) for case-insensitive login lookups.
+
+Revision ID: 0001d
+Revises: 0001c
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001d"
+down_revision = "0001c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fails if two existing accounts differ only in email case; merge them first.
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,26 @@
+"""text_pattern_ops index on posts.slug for the prefix range in slug allocation (PostgreSQL only).
+
+Revision ID: 0001e
+Revises: 0001d
+Create Date: 2026-10-18
+
+SQLite allocates slugs with a range over the existing ix_posts_slug instead.
+"""
+from alembic import op
+
+revision = "0001e"
+down_revision = "0001d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            "ix_posts_slug_pattern", "posts", ["slug"], postgresql_ops={"slug": "text_pattern_ops"}
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_posts_slug_pattern", table_name="posts")
@@ -0,0 +1,94 @@
+"""Store UUID keys natively (uuid on PostgreSQL, 16-byte BLOB elsewhere).
+
+Revision ID: 0002
+Revises: 0001e
+Create Date: 2026-10-18
+
+PostgreSQL converts the columns in place with ``USING col::uuid``; foreign keys
+are dropped first and recreated afterwards so every key changes type together.
+SQLite cannot alter a column type, but a TEXT-affinity column stores BLOB values
+unchanged, so the values are rewritten in rowid batches instead of rebuilding
+every table (which would also drop the lower(email) expression index).
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001e"
+branch_labels = None
+depends_on = None
+
+GUID_COLUMNS = {
+    "users": ["id"],
+    "posts": ["id", "author_id"],
+    "follows": ["follower_id", "following_id"],
+    "timeline_entries": ["user_id", "post_id", "author_id"],
+    "fanout_on_read_authors": ["author_id"],
+}
+BATCH_SIZE = 5000
+
+
+def _foreign_keys(bind) -> list[tuple[str, dict]]:
+    inspector = sa.inspect(bind)
+    return [(table, fk) for table in GUID_COLUMNS for fk in inspector.get_foreign_keys(table)]
+
+
+def _alter_postgresql(bind, type_, using: str) -> None:
+    foreign_keys = _foreign_keys(bind)
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk["name"], table, type_="foreignkey")
+    for table, columns in GUID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=type_, postgresql_using=using.format(column))
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk["name"], table, fk["referred_table"], fk["constrained_columns"], fk["referred_columns"]
+        )
+
+
+def _rewrite_sqlite(bind, convert) -> None:
+    for table, columns in GUID_COLUMNS.items():
+        select = sa.text(
+            f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid > :after ORDER BY rowid LIMIT :n"
+        )
+        update = sa.text(
+            f"UPDATE {table} SET {', '.join(f'{c} = :{c}' for c in columns)} WHERE rowid = :rowid"
+        )
+        after = 0
+        while rows := bind.execute(select, {"after": after, "n": BATCH_SIZE}).all():
+            bind.execute(
+                update,
+                [{"rowid": row[0], **{c: convert(v) for c, v in zip(columns, row[1:])}} for row in rows],
+            )
+            after = rows[-1][0]
+
+
+def _to_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+    return uuid.UUID(value).bytes
+
+
+def _to_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(uuid.UUID(bytes=value))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        _alter_postgresql(bind, postgresql.UUID(as_uuid=True), "{}::uuid")
+    else:
+        _rewrite_sqlite(bind, _to_bytes)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        _alter_postgresql(bind, sa.String(36), "{}::text")
+    else:
+        _rewrite_sqlite(bind, _to_str)
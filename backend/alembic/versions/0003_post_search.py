@@ -0,0 +1,45 @@
+"""Full-text search: generated tsvector + GIN on PostgreSQL, FTS5 table on SQLite.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+On SQLite the new index starts empty; run ``python -m app.cli rebuild-search``
+afterwards to index existing posts. PostgreSQL computes the generated column
+for existing rows while adding it.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(body, '')), 'B')
+            ) STORED"""
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING gin (search_vector)")
+    else:
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS post_search_docs "
+            "(doc_id INTEGER PRIMARY KEY, post_id BLOB NOT NULL UNIQUE)"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS post_search USING fts5("
+            "title, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_posts_search_vector")
+        op.execute("ALTER TABLE posts DROP COLUMN IF EXISTS search_vector")
+    else:
+        op.execute("DROP TABLE IF EXISTS post_search")
+        op.execute("DROP TABLE IF EXISTS post_search_docs")
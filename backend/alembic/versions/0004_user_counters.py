@@ -0,0 +1,44 @@
+"""Denormalized user counters; follows indexes for follower/following lists.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+COUNTERS = ("follower_count", "following_count", "post_count")
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column("users", sa.Column(name, sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """UPDATE users SET
+            follower_count = (SELECT count(*) FROM follows WHERE follows.following_id = users.id),
+            following_count = (SELECT count(*) FROM follows WHERE follows.follower_id = users.id),
+            post_count = (SELECT count(*) FROM posts
+                          WHERE posts.author_id = users.id AND posts.published_at IS NOT NULL)"""
+    )
+    op.drop_index("ix_follows_following_id", table_name="follows")
+    op.create_index(
+        "ix_follows_following_created_at", "follows", ["following_id", "created_at", "follower_id"]
+    )
+    op.create_index(
+        "ix_follows_follower_created_at", "follows", ["follower_id", "created_at", "following_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_follows_follower_created_at", table_name="follows")
+    op.drop_index("ix_follows_following_created_at", table_name="follows")
+    op.create_index("ix_follows_following_id", "follows", ["following_id"])
+    for name in COUNTERS:
+        # Plain DROP COLUMN (SQLite >= 3.35) instead of a batch rebuild, which
+        # would lose the lower(email) expression index.
+        op.execute(f"ALTER TABLE users DROP COLUMN {name}")
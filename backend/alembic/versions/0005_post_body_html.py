@@ -0,0 +1,24 @@
+"""Pre-rendered, sanitized post body HTML keyed by a content hash.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left empty: reads render missing rows on the fly until `python -m app.cli render-bodies` fills them.
+    op.add_column("posts", sa.Column("body_html", sa.Text(), nullable=True))
+    op.add_column("posts", sa.Column("body_html_hash", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "body_html_hash")
+    op.drop_column("posts", "body_html")
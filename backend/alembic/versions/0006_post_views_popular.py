@@ -0,0 +1,33 @@
+"""Post view counts and the precomputed popular feed.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Same storage as app.core.database.GUID since 0002: native uuid on Postgres, 16 bytes elsewhere.
+GUID = sa.LargeBinary(16).with_variant(postgresql.UUID(as_uuid=True), "postgresql")
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("view_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "popular_posts",
+        sa.Column("rank", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("post_id", GUID, sa.ForeignKey("posts.id"), nullable=False, unique=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("popular_posts")
+    op.drop_column("posts", "view_count")
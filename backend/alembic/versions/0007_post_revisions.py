@@ -0,0 +1,36 @@
+"""Post body revisions: revision number on posts, reverse deltas and snapshots.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Same storage as app.core.database.GUID since 0002: native uuid on Postgres, 16 bytes elsewhere.
+GUID = sa.LargeBinary(16).with_variant(postgresql.UUID(as_uuid=True), "postgresql")
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("revision", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("posts", sa.Column("revised_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "post_revisions",
+        sa.Column("post_id", GUID, sa.ForeignKey("posts.id"), primary_key=True),
+        sa.Column("revision", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("body", sa.Text(), nullable=True),
+        sa.Column("delta", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("post_revisions")
+    op.drop_column("posts", "revised_at")
+    op.drop_column("posts", "revision")
@@ -0,0 +1,21 @@
+"""When a user's denormalized counters last changed, for profile Last-Modified.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("counts_changed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "counts_changed_at")
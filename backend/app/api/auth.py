@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, mark_write
 from app.core.database import get_db
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.principal import invalidate_user
+from app.core.security import create_access_token, password_hasher
 from app.models.user import User
 from app.schemas.auth import Token, LoginRequest
 from app.schemas.user import UserCreate, UserResponse
@@ -13,37 +14,49 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 def _email_match(query_email: str):
-    """Case-insensitive email comparison for SQLite and Postgres."""
+    """Case-insensitive email comparison for SQLite and Postgres (uses ix_users_email_lower)."""
     return func.lower(User.email) == query_email.lower()
 
 
+# bcrypt runs in the password hasher's process pool, off the event loop. The
+# lookups' transaction ends before it does, so no transaction (on SQLite, the
+# write lock) is held while it runs.
 @router.post("/register", response_model=Token)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(_email_match(data.email)).first():
+async def register(data: UserCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).where(_email_match(data.email))):
         raise HTTPException(status_code=400, detail="Email already registered")
-    if db.query(User).filter(User.username == data.username).first():
+    if await db.scalar(select(User.id).where(User.username == data.username)):
         raise HTTPException(status_code=400, detail="Username already taken")
+    await db.commit()
     user = User(
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await password_hasher.hash(data.password),
         username=data.username,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    mark_write(request, user.id)
     access_token = create_access_token(data={"sub": str(user.id)})
     return Token(access_token=access_token, user=UserResponse.model_validate(user))
 
 
 @router.post("/login", response_model=Token)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(_email_match(data.email)).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(_email_match(data.email)))
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    await db.commit()
+    verified, new_hash = await password_hasher.verify_and_update(data.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(user.id)
     access_token = create_access_token(data={"sub": str(user.id)})
     return Token(access_token=access_token, user=UserResponse.model_validate(user))
 
 
 @router.get("/me", response_model=UserResponse)
-def me(user: User = Depends(get_current_user)):
+async def me(user: User = Depends(get_current_user)):
     return user
@@ -1,20 +1,24 @@
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.config import settings
+from app.core.database import SessionLocal, get_db, get_engine, get_read_engine
+from app.core.principal import load_user
+from app.core.replication import LAST_WRITE_HEADER, set_last_write, wrote_recently
 from app.core.security import decode_access_token
 from app.models.user import User
 
 security = HTTPBearer(auto_error=False)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 
-def get_current_user_optional(
-    db: Session = Depends(get_db),
+async def get_current_user_id_optional(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
-) -> User | None:
+) -> UUID | None:
+    """The user id from a valid token's claims, without touching the database."""
     if not credentials:
         return None
     token = credentials.credentials
@@ -24,16 +28,45 @@ def get_current_user_optional(
     user_id = payload.get("sub")
     if not user_id:
         return None
-    user = db.query(User).filter(User.id == UUID(str(user_id))).first()
-    return user
+    try:
+        return UUID(str(user_id))
+    except ValueError:
+        return None
+
+
+async def get_current_user_optional(
+    db: AsyncSession = Depends(get_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
+) -> User | None:
+    if user_id is None:
+        return None
+    return await load_user(db, user_id)
 
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     user: User | None = Depends(get_current_user_optional),
-) -> User:
+):
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
-    return user
+    yield user
+    # Runs after the handler returns (before the response is sent), so only
+    # completed writes pin the user's next reads to the primary.
+    if request.method not in SAFE_METHODS:
+        mark_write(request, user.id)
+
+
+def mark_write(request: Request, user_id) -> None:
+    if settings.read_database_url:
+        set_last_write(request, user_id)
+
+
+async def get_read_db(request: Request, user_id: UUID | None = Depends(get_current_user_id_optional)):
+    """Session for read-only routes: a replica, or the primary for a user whose ``X-Last-Write`` is fresh."""
+    recent_writer = user_id is not None and wrote_recently(request.headers.get(LAST_WRITE_HEADER), user_id)
+    engine = get_engine(read_only=True) if recent_writer else get_read_engine()
+    async with SessionLocal(bind=engine) as db:
+        yield db
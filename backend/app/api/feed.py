@@ -1,55 +1,68 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
+from uuid import UUID
 
-from app.api.deps import get_current_user_optional
-from app.core.database import get_db
-from app.models.user import User
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_id_optional, get_read_db
+from app.core import timeline
+from app.core.popular import POPULAR_TAG
+from app.core.cache import LISTS_TAG, post_tags, response_cache
+from app.core.pagination import next_cursor_headers, paginate_posts
+from app.core.serializers import dumps, json_response, post_dicts, post_rows
+from app.models.popular import PopularPost
 from app.models.post import Post
 from app.models.follow import Follow
-from app.schemas.post import PostResponse, PostAuthor
+from app.schemas.post import PostFields, PostResponse, PostSummary
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
 
-def _post_to_response(post: Post) -> PostResponse:
-    return PostResponse(
-        id=post.id,
-        author_id=post.author_id,
-        author=PostAuthor(
-            id=post.author.id,
-            username=post.author.username,
-            display_name=post.author.display_name,
-            avatar_url=post.author.avatar_url,
-        ) if post.author else None,
-        title=post.title,
-        slug=post.slug,
-        body=post.body,
-        body_format=post.body_format,
-        cover_image_url=post.cover_image_url,
-        published_at=post.published_at,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+@router.get("", response_model=list[PostResponse] | list[PostSummary])
+async def get_feed(
+    request: Request,
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    fields: PostFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
+):
+    if user_id and await db.scalar(select(Follow.following_id).where(Follow.follower_id == user_id).limit(1)):
+        posts = await timeline.timeline_posts(db, user_id, limit, offset, cursor, fields)
+        return json_response(post_dicts(posts, fields), next_cursor_headers(posts, limit))
+    # Everyone without a personalized timeline sees the same global feed.
+    key = response_cache.key_for(request)
+    cached = response_cache.get(key)
+    if cached:
+        return cached
+    q = post_rows(fields).where(Post.published_at.isnot(None))
+    posts = (await db.execute(paginate_posts(q, limit, offset, cursor))).all()
+    content = dumps(post_dicts(posts, fields))
+    return response_cache.store(key, content, {LISTS_TAG} | post_tags(posts), next_cursor_headers(posts, limit))
 
 
-@router.get("", response_model=list[PostResponse])
-def get_feed(
+@router.get("/popular", response_model=list[PostResponse] | list[PostSummary])
+async def get_popular_feed(
+    request: Request,
     limit: int = Query(20, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    user: User | None = Depends(get_current_user_optional),
+    fields: PostFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    if user:
-        following_ids = [r[0] for r in db.query(Follow.following_id).filter(Follow.follower_id == user.id).all()]
-        if following_ids:
-            q = (
-                db.query(Post)
-                .options(joinedload(Post.author))
-                .filter(Post.published_at.isnot(None), Post.author_id.in_(following_ids))
-            )
-        else:
-            q = db.query(Post).options(joinedload(Post.author)).filter(Post.published_at.isnot(None))
-    else:
-        q = db.query(Post).options(joinedload(Post.author)).filter(Post.published_at.isnot(None))
-    posts = q.order_by(Post.published_at.desc()).offset(offset).limit(limit).all()
-    return [_post_to_response(p) for p in posts]
+    """Published posts ranked by recent readership, from the precomputed ``popular_posts``."""
+    key = response_cache.key_for(request)
+    cached = response_cache.get(key)
+    if cached:
+        return cached
+    q = (
+        post_rows(fields)
+        .join(PopularPost, PopularPost.post_id == Post.id)
+        .where(Post.published_at.isnot(None))
+        .order_by(PopularPost.rank)
+        .offset(offset)
+        .limit(limit)
+    )
+    posts = (await db.execute(q)).all()
+    content = dumps(post_dicts(posts, fields))
+    return response_cache.store(key, content, {LISTS_TAG, POPULAR_TAG} | post_tags(posts))
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import response_cache
+from app.core.database import get_engine, pool_stats
+from app.core.metrics import Gauge, registry
+from app.core.security import password_hasher
+from app.core.views import view_counter
+
+router = APIRouter(tags=["metrics"])
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _gauges(prefix: str, stats: dict, help: str):
+    for key, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            gauge = Gauge(f"{prefix}_{key}", f"{help}: {key}.")
+            gauge.set(value=value)
+            yield gauge
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: request/SQL metrics plus the pool, cache, hasher and view buffer stats."""
+    extra = [
+        *_gauges("db_pool", pool_stats.as_dict(get_engine().sync_engine.pool), "Connection pool"),
+        *_gauges("response_cache", response_cache.stats(), "Response cache"),
+        *_gauges("password_hash", password_hasher.stats(), "Password hashing pool"),
+        *_gauges("post_views", view_counter.stats(), "Write-behind post view buffer"),
+    ]
+    return PlainTextResponse(registry.render(extra), media_type=CONTENT_TYPE)
@@ -1,148 +1,402 @@
+import zipfile
 from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.api.deps import get_current_user, get_current_user_optional
+from app.api.deps import get_current_user, get_current_user_id_optional, get_read_db
+from app.core import counters, importer, popular, revisions, search, timeline
+from app.core.batch import in_request_order, parse_uuids, split_keys
+from app.core.cache import LISTS_TAG, post_tag, post_tags, response_cache
+from app.core.conditional import has_validators, is_not_modified, not_modified, post_validators
 from app.core.database import get_db
-from app.core.slug import slugify
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_rank_cursor, next_cursor_headers, paginate_posts
+from app.core.principal import invalidate_user
+from app.core.serializers import dumps, json_response, post_dict, post_dict_from_orm, post_dicts, post_rows
+from app.core.slug import add_with_unique_slug, slugify
+from app.core.render import RENDERER_VERSION, apply_render
+from app.core.summary import apply_summary, summarize
+from app.core.views import view_counter
 from app.models.user import User
 from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate, PostResponse, PostAuthor
+from app.models.revision import PostRevision
+from app.schemas.post import (
+    PostBatch, PostBodyPatch, PostCreate, PostDetailFields, PostFields, PostResponse, PostRevisionBody,
+    PostRevisionInfo, PostRevisionSaved, PostSearchResult, PostSummary, PostUpdate,
+)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
-def _post_to_response(post: Post) -> PostResponse:
-    return PostResponse(
-        id=post.id,
-        author_id=post.author_id,
-        author=PostAuthor(
-            id=post.author.id,
-            username=post.author.username,
-            display_name=post.author.display_name,
-            avatar_url=post.author.avatar_url,
-        ) if post.author else None,
-        title=post.title,
-        slug=post.slug,
-        body=post.body,
-        body_format=post.body_format,
-        cover_image_url=post.cover_image_url,
-        published_at=post.published_at,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+def _post_row(where, fields: PostDetailFields = "full"):
+    """Detail post row plus ``revised_at`` and the author's updated_at for the validators."""
+    return post_rows(fields).add_columns(Post.revised_at, User.updated_at.label("author_updated_at")).where(where)
+
+
+def _validators(row, fields: PostDetailFields = "full") -> dict[str, str]:
+    variant = ("html", RENDERER_VERSION) if fields == "html" else ()
+    return post_validators(row.id, row.published_at, row.updated_at, row.revised_at, row.author_updated_at, *variant)
 
 
 @router.post("", response_model=PostResponse)
-def create_post(
+async def create_post(
     data: PostCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    base_slug = slugify(data.title)
-    slug = base_slug
-    n = 0
-    while db.query(Post).filter(Post.slug == slug).first():
-        n += 1
-        slug = f"{base_slug}-{n}"
     post = Post(
         author_id=user.id,
         title=data.title,
-        slug=slug,
         body=data.body,
         body_format=data.body_format,
         cover_image_url=data.cover_image_url,
         published_at=datetime.utcnow() if data.published else None,
     )
-    db.add(post)
-    db.commit()
-    db.refresh(post)
-    post = db.query(Post).options(joinedload(Post.author)).filter(Post.id == post.id).first()
-    return _post_to_response(post)
+    apply_summary(post)
+    apply_render(post)
+    await add_with_unique_slug(db, post, slugify(data.title))
+    await search.index_post(db, post)
+    if post.published_at:
+        await timeline.publish_post(db, post)
+        await counters.adjust(db, user.id, post_count=1)
+    await db.commit()
+    if post.published_at:
+        invalidate_user(user.id)
+        response_cache.invalidate(LISTS_TAG)
+    row = (await db.execute(post_rows("full").where(Post.id == post.id))).one()
+    return json_response(post_dict(row))
 
 
-@router.get("", response_model=list[PostResponse])
-def list_posts(
+@router.post("/import", response_class=StreamingResponse)
+async def import_posts(request: Request, user: User = Depends(get_current_user)):
+    """Bulk-create posts from NDJSON or a zip of markdown files, streaming per-item results as NDJSON."""
+    content_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    if content_type not in importer.NDJSON_TYPES | importer.ZIP_TYPES:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or application/zip")
+    upload = await importer.spool(request)
+    if content_type in importer.ZIP_TYPES:
+        if not zipfile.is_zipfile(upload):
+            upload.close()
+            raise HTTPException(status_code=400, detail="Not a zip archive")
+        items = importer.zip_items(upload)
+    else:
+        items = importer.ndjson_items(upload)
+    return StreamingResponse(importer.import_posts(user.id, items), media_type=importer.MEDIA_TYPE)
+
+
+@router.get("", response_model=list[PostResponse] | list[PostSummary])
+async def list_posts(
+    request: Request,
     author_id: UUID | None = Query(None),
     limit: int = Query(20, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None),
+    fields: PostFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    q = db.query(Post).options(joinedload(Post.author)).filter(Post.published_at.isnot(None))
+    key = response_cache.key_for(request)
+    cached = response_cache.get(key)
+    if cached:
+        return cached
+    q = post_rows(fields).where(Post.published_at.isnot(None))
     if author_id:
-        q = q.filter(Post.author_id == author_id)
-    posts = q.order_by(Post.published_at.desc()).offset(offset).limit(limit).all()
-    return [_post_to_response(p) for p in posts]
+        q = q.where(Post.author_id == author_id)
+    posts = (await db.execute(paginate_posts(q, limit, offset, cursor))).all()
+    content = dumps(post_dicts(posts, fields))
+    return response_cache.store(key, content, {LISTS_TAG} | post_tags(posts), next_cursor_headers(posts, limit))
+
+
+@router.get("/search", response_model=list[PostSearchResult])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    hits = await search.search_posts(db, q, limit, cursor)
+    rows = await db.execute(post_rows("summary").where(Post.id.in_([h[0] for h in hits])))
+    posts = {row.id: row for row in rows}
+    headers = {}
+    if len(hits) == limit:
+        post_id, score, _ = hits[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_rank_cursor(score, post_id)
+    return json_response(
+        [
+            {**post_dict(posts[post_id], "summary"), "score": score, "snippet": snippet}
+            for post_id, score, snippet in hits
+            if post_id in posts
+        ],
+        headers,
+    )
+
+
+@router.get("/batch", response_model=PostBatch)
+async def get_posts_batch(
+    ids: list[str] = Query([], description="Post ids, repeated or comma-separated"),
+    fields: PostFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
+):
+    keys = split_keys(ids)
+    uuids = parse_uuids(keys)
+    rows = await db.execute(post_rows(fields).where(Post.id.in_(set(uuids.values()))))
+    # Same visibility as get_post: drafts only for their author, otherwise reported missing.
+    found = {
+        row.id: post_dict(row, fields) for row in rows if row.published_at or row.author_id == user_id
+    }
+    return json_response(in_request_order(keys, found, uuids.get))
+
+
+def _post_version():
+    """Just what the validators need, so revalidation never loads or serializes the post."""
+    return select(
+        Post.id, Post.author_id, Post.published_at, Post.updated_at, Post.revised_at,
+        User.updated_at.label("author_updated_at"),
+    ).join(User, User.id == Post.author_id)
+
+
+async def _check_not_modified(
+    db: AsyncSession, request: Request, where, user_id: UUID | None, fields: PostDetailFields
+) -> Response | None:
+    if not has_validators(request):
+        return None
+    version = (await db.execute(_post_version().where(where))).first()
+    if not version or (not version.published_at and version.author_id != user_id):
+        return None
+    headers = _validators(version, fields)
+    return not_modified(headers) if is_not_modified(request, headers) else None
 
 
 @router.get("/slug/{slug}", response_model=PostResponse)
-def get_post_by_slug(
+async def get_post_by_slug(
     slug: str,
-    db: Session = Depends(get_db),
-    user: User | None = Depends(get_current_user_optional),
+    request: Request,
+    fields: PostDetailFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
 ):
-    post = db.query(Post).options(joinedload(Post.author)).filter(Post.slug == slug).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    if not post.published_at and (not user or post.author_id != user.id):
+    # Only published posts are stored, so a hit is safe to serve to anyone.
+    key = response_cache.key_for(request)
+    cached = response_cache.get(key)
+    if cached:
+        view_counter.record(slug)
+        return not_modified(cached.headers) if is_not_modified(request, cached.headers) else cached
+    unchanged = await _check_not_modified(db, request, Post.slug == slug, user_id, fields)
+    if unchanged:
+        view_counter.record(slug)  # drafts are filtered out when the views are flushed
+        return unchanged
+    row = (await db.execute(_post_row(Post.slug == slug, fields))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Post not found")
-    return _post_to_response(post)
+    view_counter.record(slug)
+    if not row.published_at:
+        if row.author_id != user_id:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return json_response(post_dict(row, fields), _validators(row, fields))
+    return response_cache.store(key, dumps(post_dict(row, fields)), post_tags([row]), _validators(row, fields))
 
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post(
+async def get_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
-    user: User | None = Depends(get_current_user_optional),
+    request: Request,
+    fields: PostDetailFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
 ):
-    post = db.query(Post).options(joinedload(Post.author)).filter(Post.id == post_id).first()
-    if not post:
+    unchanged = await _check_not_modified(db, request, Post.id == post_id, user_id, fields)
+    if unchanged:
+        return unchanged
+    row = (await db.execute(_post_row(Post.id == post_id, fields))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Post not found")
-    if not post.published_at and (not user or post.author_id != user.id):
+    if not row.published_at and row.author_id != user_id:
         raise HTTPException(status_code=404, detail="Post not found")
-    return _post_to_response(post)
+    return json_response(post_dict(row, fields), _validators(row, fields))
 
 
 @router.patch("/{post_id}", response_model=PostResponse)
-def update_post(
+async def update_post(
     post_id: UUID,
     data: PostUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    post = db.query(Post).options(joinedload(Post.author)).filter(Post.id == post_id).first()
+    post = await db.scalar(select(Post).options(joinedload(Post.author)).where(Post.id == post_id))
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if post.author_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed to edit this post")
+    if data.base_revision is not None and data.base_revision != post.revision:
+        raise _stale_revision(data.base_revision, post.revision)
     if data.title is not None:
         post.title = data.title
-    if data.body is not None:
+    if data.body is not None and data.body != post.body:
+        # Claim the next revision the way autosave does, so a concurrent autosave can't take it too.
+        base = post.revision
+        claimed = await db.execute(
+            update(Post)
+            .where(Post.id == post.id, Post.revision == base)
+            .values(revision=base + 1, updated_at=Post.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if not claimed.rowcount:
+            await db.rollback()
+            raise _stale_revision(base, base + 1)
+        # A wholesale replacement: keep the old body as a snapshot rather than diffing.
+        await revisions.record(db, post.id, base, post.revised_at or post.updated_at, body=post.body)
+        post.revision = base + 1
+        post.revised_at = datetime.utcnow()
         post.body = data.body
+        apply_summary(post)
+    if data.title is not None or data.body is not None:
+        await search.index_post(db, post)
     if data.body_format is not None:
         post.body_format = data.body_format
+    apply_render(post)
     if data.cover_image_url is not None:
         post.cover_image_url = data.cover_image_url
     if data.published is not None:
+        await counters.adjust(db, user.id, post_count=int(data.published) - int(post.published_at is not None))
         post.published_at = datetime.utcnow() if data.published else None
-    db.commit()
-    db.refresh(post)
-    return _post_to_response(post)
+        if post.published_at:
+            await timeline.publish_post(db, post)
+        else:
+            await timeline.remove_post(db, post.id)
+    await db.commit()
+    response_cache.invalidate(post_tag(post.id))
+    if data.published is not None:
+        invalidate_user(user.id)
+        response_cache.invalidate(LISTS_TAG)
+    return json_response(post_dict_from_orm(post))
 
 
 @router.delete("/{post_id}", status_code=204)
-def delete_post(
+async def delete_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if post.author_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed to delete this post")
-    db.delete(post)
-    db.commit()
+    await timeline.remove_post(db, post.id)
+    await search.remove_post(db, post.id)
+    await popular.remove_post(db, post.id)
+    await db.execute(delete(PostRevision).where(PostRevision.post_id == post.id))
+    if post.published_at:
+        await counters.adjust(db, user.id, post_count=-1)
+    await db.delete(post)
+    await db.commit()
+    invalidate_user(user.id)
+    response_cache.invalidate(post_tag(post_id), LISTS_TAG)
     return None
+
+
+def _stale_revision(base: int, current: int) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"Base revision {base} is stale; the post is at revision {current}")
+
+
+async def _own_post(db: AsyncSession, post_id: UUID, user: User, *columns):
+    row = (await db.execute(select(Post.author_id, *columns).where(Post.id == post_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if row.author_id != user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to edit this post")
+    return row
+
+
+@router.patch("/{post_id}/body", response_model=PostRevisionSaved)
+async def autosave_post_body(
+    post_id: UUID,
+    data: PostBodyPatch,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Apply text ops to a draft's body if it is still at ``base_revision`` (409 otherwise).
+
+    Ops that leave the body as it was (none, only retains) save nothing and return the current revision.
+    The rendered HTML is left stale until the next full update; reads render it on the fly meanwhile.
+    """
+    row = await _own_post(
+        db, post_id, user, Post.title, Post.body, Post.published_at, Post.revision, Post.revised_at, Post.updated_at
+    )
+    if row.published_at:
+        raise HTTPException(status_code=409, detail="Autosave is for drafts; update published posts with PATCH")
+    if row.revision != data.base_revision:
+        raise _stale_revision(data.base_revision, row.revision)
+    try:
+        body, undo = revisions.apply_ops(row.body, data.ops)
+    except revisions.InvalidOps as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if body == row.body:
+        return json_response({"id": post_id, "revision": row.revision, "revised_at": row.revised_at or row.updated_at})
+    now = datetime.utcnow()
+    # Compare-and-set on the revision: of two autosaves from the same base, only one lands.
+    saved = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.revision == data.base_revision)
+        .values(body=body, **summarize(body), revision=Post.revision + 1, revised_at=now, updated_at=Post.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    if not saved.rowcount:
+        await db.rollback()
+        raise _stale_revision(data.base_revision, data.base_revision + 1)
+    snapshot = revisions.is_snapshot(row.revision)
+    await revisions.record(
+        db, post_id, row.revision, row.revised_at or row.updated_at,
+        body=row.body if snapshot else None, undo=None if snapshot else undo,
+    )
+    await search.reindex(db, post_id, row.title, body)
+    await db.commit()
+    return json_response({"id": post_id, "revision": row.revision + 1, "revised_at": now})
+
+
+@router.get("/{post_id}/revisions", response_model=list[PostRevisionInfo])
+async def list_post_revisions(
+    post_id: UUID,
+    before: int | None = Query(None, description="Only revisions older than this one (paging)"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    """The author's revision history, newest first, starting with the current revision."""
+    row = await _own_post(db, post_id, user, Post.revision, Post.revised_at, Post.updated_at)
+    entries = []
+    if before is None or before > row.revision:
+        entries.append({"revision": row.revision, "created_at": row.revised_at or row.updated_at, "snapshot": True})
+    below = row.revision if before is None else min(before, row.revision)
+    older = await revisions.history(db, post_id, below, limit - len(entries))
+    entries += [dict(r._mapping) for r in older]
+    return json_response(entries)
+
+
+@router.get("/{post_id}/revisions/{revision}", response_model=PostRevisionBody)
+async def get_post_revision(
+    post_id: UUID,
+    revision: int,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    row = await _own_post(db, post_id, user, Post.body, Post.revision, Post.revised_at, Post.updated_at)
+    body = None
+    if 0 < revision <= row.revision:
+        try:
+            body = await revisions.body_at(db, post_id, revision, row.revision, row.body)
+        except revisions.InvalidOps:
+            raise HTTPException(status_code=409, detail=f"Revision {revision} can't be rebuilt from the stored history")
+    if body is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    if revision == row.revision:
+        created_at = row.revised_at or row.updated_at
+    else:
+        created_at = await db.scalar(
+            select(PostRevision.created_at).where(PostRevision.post_id == post_id, PostRevision.revision == revision)
+        )
+    return json_response({"revision": revision, "created_at": created_at, "body": body})
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.core.cache import response_cache
+from app.core.database import get_engine, pool_stats
+from app.core.security import password_hasher
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/cache")
+async def cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/password-hash")
+async def password_hash_stats():
+    return password_hasher.stats()
+
+
+@router.get("/pool")
+async def connection_pool_stats():
+    return pool_stats.as_dict(get_engine().sync_engine.pool)
@@ -1,15 +1,25 @@
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_current_user_optional
+from app.api.deps import get_current_user, get_read_db
+from app.core import counters, export, timeline
+from app.core.batch import in_request_order, parse_uuids, split_keys
+from app.core.cache import author_tag, response_cache
+from app.core.conditional import has_validators, is_not_modified, not_modified, user_validators
 from app.core.database import get_db
+from app.core.principal import invalidate_user
+from app.core.pagination import next_cursor_headers, paginate_posts
+from app.core.serializers import json_response, post_dicts, post_rows, user_dict, user_rows
 from app.models.user import User
 from app.models.post import Post
 from app.models.follow import Follow
-from app.schemas.user import UserResponse, UserUpdate
-from app.schemas.post import PostResponse, PostAuthor
+from app.schemas.user import FollowUser, UserBatch, UserResponse, UserUpdate
+from app.schemas.post import PostFields, PostResponse, PostSummary
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -18,108 +28,190 @@ def _user_to_response(user: User) -> UserResponse:
     return UserResponse.model_validate(user)
 
 
-def _post_to_response(post: Post) -> PostResponse:
-    return PostResponse(
-        id=post.id,
-        author_id=post.author_id,
-        author=PostAuthor(
-            id=post.author.id,
-            username=post.author.username,
-            display_name=post.author.display_name,
-            avatar_url=post.author.avatar_url,
-        ) if post.author else None,
-        title=post.title,
-        slug=post.slug,
-        body=post.body,
-        body_format=post.body_format,
-        cover_image_url=post.cover_image_url,
-        published_at=post.published_at,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
-
-
 @router.get("/me", response_model=UserResponse)
-def get_me(user: User = Depends(get_current_user)):
+async def get_me(user: User = Depends(get_current_user)):
     return _user_to_response(user)
 
 
 @router.patch("/me", response_model=UserResponse)
-def update_me(
+async def update_me(
     data: UserUpdate,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
+    user = await db.get(User, current_user.id)
     if data.display_name is not None:
         user.display_name = data.display_name
     if data.bio is not None:
         user.bio = data.bio
     if data.avatar_url is not None:
         user.avatar_url = data.avatar_url
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_user(user.id)
+    response_cache.invalidate(author_tag(user.id))
     return _user_to_response(user)
 
 
-@router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: UUID, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+@router.get("/me/export", response_class=StreamingResponse)
+async def export_me(
+    compress: bool = Query(False, description="gzip the NDJSON (served as a .ndjson.gz download)"),
+    user: User = Depends(get_current_user),
+):
+    """Stream the caller's profile, posts (drafts included) and follow lists as NDJSON."""
+    filename = f"folio-{user.username}-{date.today().isoformat()}.ndjson"
+    body = export.export_user(user.id)
+    if compress:
+        body, filename = export.gzipped(body), filename + ".gz"
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress else export.MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/batch", response_model=UserBatch)
+async def get_users_batch(
+    ids: list[str] = Query([], description="User ids, repeated or comma-separated"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    keys = split_keys(ids)
+    uuids = parse_uuids(keys)
+    rows = await db.execute(user_rows().where(User.id.in_(set(uuids.values()))))
+    return json_response(in_request_order(keys, {row.id: user_dict(row) for row in rows}, uuids.get))
+
+
+@router.get("/batch/by-username", response_model=UserBatch)
+async def get_users_batch_by_username(
+    usernames: list[str] = Query([], description="Usernames, repeated or comma-separated"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    keys = split_keys(usernames)
+    rows = await db.execute(user_rows().where(User.username.in_(keys)))
+    return json_response(in_request_order(keys, {row.username: user_dict(row) for row in rows}, str))
+
+
+def _validators(user) -> dict[str, str]:
+    counts = (getattr(user, name) for name in counters.COUNTERS)
+    return user_validators(user.id, user.updated_at, user.counts_changed_at, *counts)
+
+
+async def _get_user(db: AsyncSession, request: Request, response: Response, where) -> UserResponse | Response:
+    if has_validators(request):
+        columns = (getattr(User, name) for name in counters.COUNTERS)
+        version = (
+            await db.execute(select(User.id, User.updated_at, User.counts_changed_at, *columns).where(where))
+        ).first()
+        if version:
+            headers = _validators(version)
+            if is_not_modified(request, headers):
+                return not_modified(headers)
+    user = await db.scalar(select(User).where(where))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    response.headers.update(_validators(user))
     return _user_to_response(user)
 
 
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(user_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    return await _get_user(db, request, response, User.id == user_id)
+
+
 @router.get("/by-username/{username}", response_model=UserResponse)
-def get_user_by_username(username: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return _user_to_response(user)
+async def get_user_by_username(
+    username: str, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+):
+    return await _get_user(db, request, response, User.username == username)
 
 
-@router.get("/{user_id}/posts", response_model=list[PostResponse])
-def get_user_posts(
+@router.get("/{user_id}/posts", response_model=list[PostResponse] | list[PostSummary])
+async def get_user_posts(
     user_id: UUID,
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_current_user_optional),
+    cursor: str | None = None,
+    fields: PostFields = Query("full"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
         raise HTTPException(status_code=404, detail="User not found")
-    q = db.query(Post).options(joinedload(Post.author)).filter(Post.author_id == user_id, Post.published_at.isnot(None))
-    posts = q.order_by(Post.published_at.desc()).offset(offset).limit(limit).all()
-    return [_post_to_response(p) for p in posts]
+    q = post_rows(fields).where(Post.author_id == user_id, Post.published_at.isnot(None))
+    posts = (await db.execute(paginate_posts(q, limit, offset, cursor))).all()
+    return json_response(post_dicts(posts, fields), next_cursor_headers(posts, limit))
+
+
+async def _follow_page(db: AsyncSession, user_id: UUID, owner_col, other_col, limit: int, cursor: str | None):
+    """One page of the users on the other side of ``user_id``'s follows, most recent first."""
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
+        raise HTTPException(status_code=404, detail="User not found")
+    q = (
+        select(User.id, User.username, User.display_name, User.avatar_url, Follow.created_at.label("followed_at"))
+        .join(Follow, other_col == User.id)
+        .where(owner_col == user_id)
+    )
+    rows = (await db.execute(paginate_posts(q, limit, cursor=cursor, keys=(Follow.created_at, other_col)))).all()
+    return json_response(
+        [dict(row._mapping) for row in rows], next_cursor_headers(rows, limit, keys=("followed_at", "id"))
+    )
+
+
+@router.get("/{user_id}/followers", response_model=list[FollowUser])
+async def get_followers(
+    user_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await _follow_page(db, user_id, Follow.following_id, Follow.follower_id, limit, cursor)
+
+
+@router.get("/{user_id}/following", response_model=list[FollowUser])
+async def get_following(
+    user_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await _follow_page(db, user_id, Follow.follower_id, Follow.following_id, limit, cursor)
 
 
 @router.post("/me/follow/{user_id}", status_code=204)
-def follow_user(
+async def follow_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
-    target = db.query(User).filter(User.id == user_id).first()
-    if not target:
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
         raise HTTPException(status_code=404, detail="User not found")
-    if db.query(Follow).filter(Follow.follower_id == current_user.id, Follow.following_id == user_id).first():
+    if await db.scalar(select(Follow).where(Follow.follower_id == current_user.id, Follow.following_id == user_id)):
         return None
     follow = Follow(follower_id=current_user.id, following_id=user_id)
     db.add(follow)
-    db.commit()
+    await counters.adjust(db, current_user.id, following_count=1)
+    await counters.adjust(db, user_id, follower_count=1)
+    await timeline.follow(db, current_user.id, user_id)
+    await db.commit()
+    invalidate_user(current_user.id)
+    invalidate_user(user_id)
     return None
 
 
 @router.delete("/me/follow/{user_id}", status_code=204)
-def unfollow_user(
+async def unfollow_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    follow = db.query(Follow).filter(Follow.follower_id == current_user.id, Follow.following_id == user_id).first()
-    if follow:
-        db.delete(follow)
-        db.commit()
+    removed = await db.execute(
+        delete(Follow).where(Follow.follower_id == current_user.id, Follow.following_id == user_id)
+    )
+    if removed.rowcount:
+        await counters.adjust(db, current_user.id, following_count=-1)
+        await counters.adjust(db, user_id, follower_count=-1)
+        await timeline.unfollow(db, current_user.id, user_id)
+        await db.commit()
+        invalidate_user(current_user.id)
+        invalidate_user(user_id)
     return None
@@ -0,0 +1,124 @@
+"""Maintenance commands: ``python -m app.cli <command>``.
+
+Schema changes (tables, columns, indexes) are Alembic migrations only: run
+``alembic upgrade head``. These commands fill and repair data.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.core import counters, popular, render, search, timeline
+from app.core.database import SessionLocal, dispose_engine, get_engine
+from app.core.summary import apply_summary
+from app.core.views import view_counter
+from app.models.post import Post
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+
+async def backfill_timelines(args) -> None:
+    """Rebuild every home timeline from the existing follow graph."""
+    async with SessionLocal() as db:
+        written = await timeline.backfill(db)
+    print(f"wrote {written} timeline entries")
+
+
+async def backfill_summaries(args) -> None:
+    """Compute excerpt, word count and reading time for posts written before they existed."""
+    updated = 0
+    async with SessionLocal() as db:
+        while True:
+            posts = (await db.scalars(select(Post).where(Post.word_count.is_(None)).limit(500))).all()
+            if not posts:
+                break
+            for post in posts:
+                apply_summary(post)
+            await db.commit()
+            updated += len(posts)
+    print(f"updated {updated} posts")
+
+
+async def render_bodies(args) -> None:
+    """Render body HTML for posts with no stored render or one from an older renderer."""
+    rendered, last_id = 0, None
+    async with SessionLocal() as db:
+        while True:
+            q = select(Post.id, Post.body, Post.body_format, Post.body_html_hash).order_by(Post.id).limit(500)
+            if last_id is not None:
+                q = q.where(Post.id > last_id)
+            rows = (await db.execute(q)).all()
+            if not rows:
+                break
+            for row in rows:
+                key = render.content_hash(row.body, row.body_format)
+                if row.body_html_hash == key:
+                    continue
+                # updated_at moves with the HTML so Last-Modified does too; If-Modified-Since
+                # clients never see the ETag's renderer version.
+                await db.execute(
+                    update(Post)
+                    .where(Post.id == row.id)
+                    .values(body_html=render.render_body(row.body, row.body_format), body_html_hash=key)
+                )
+                rendered += 1
+            await db.commit()
+            last_id = rows[-1].id
+    print(f"rendered {rendered} posts")
+
+
+async def rebuild_search(args) -> None:
+    """Reindex every post for full-text search (the index itself comes from migration 0003)."""
+    async with SessionLocal() as db:
+        indexed = await search.rebuild(db)
+    print(f"indexed {indexed} posts")
+
+
+async def reconcile_counters(args) -> None:
+    """Recompute follower/following/post counters from the follows and posts tables."""
+    async with SessionLocal() as db:
+        drifted = await counters.reconcile(db)
+    print(f"fixed counters for {drifted} users")
+
+
+async def flush_views(args) -> None:
+    """Apply view counts left in the spill file (e.g. after a crash) to posts.view_count."""
+    print(f"applied {await view_counter.flush()} views")
+
+
+async def refresh_popular(args) -> None:
+    """Recompute the popular feed now."""
+    async with SessionLocal() as db:
+        ranked = await popular.refresh(db)
+    print(f"ranked {ranked} posts")
+
+
+COMMANDS = {
+    "backfill-timelines": backfill_timelines,
+    "backfill-summaries": backfill_summaries,
+    "render-bodies": render_bodies,
+    "rebuild-search": rebuild_search,
+    "reconcile-counters": reconcile_counters,
+    "flush-views": flush_views,
+    "refresh-popular": refresh_popular,
+}
+
+
+async def _run(command, args) -> None:
+    get_engine()
+    try:
+        await command(args)
+    finally:
+        await dispose_engine()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, fn in COMMANDS.items():
+        sub.add_parser(name, help=fn.__doc__)
+    args = parser.parse_args(argv)
+    asyncio.run(_run(COMMANDS[args.command], args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
@@ -5,12 +6,97 @@ class Settings(BaseSettings):
     # Database (use SQLite by default if no .env; set DATABASE_URL for Postgres)
     database_url: str = "sqlite:///./folio.db"
 
+    # Read replicas as a JSON list, e.g. ["postgresql://…@replica1/folio", "…"]; GET
+    # routes read from them round-robin (the primary when empty). For this many
+    # seconds after a user's write, reads that send back the X-Last-Write
+    # header from that write stay on the primary.
+    read_database_url: list[str] = []
+    read_your_writes_seconds: float = 5
+
+    # Connection pool (SQLite in-memory databases use a single shared connection)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Run `alembic upgrade head` when the app starts (single-process dev setups;
+    # in production migrate once per deploy, not from every worker)
+    auto_migrate: bool = False
+
+    # Applied to every new SQLite connection; cache_size < 0 is in KiB
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000
+
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
 
-    # App
+    # Password hashing (bcrypt runs in its own process pool)
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_concurrency: int = 2
+    token_cache_max_entries: int = 10000
+    user_cache_ttl_seconds: int = 60
+    user_cache_max_entries: int = 10000
+
+    # Home timelines: authors above this follower count are merged in at read time
+    timeline_fanout_max_followers: int = 10000
+    timeline_follow_backfill: int = 200
+
+    # Post views are buffered per worker and added to posts.view_count every
+    # VIEW_FLUSH_SECONDS; each batch is appended to VIEW_SPILL_PATH (shared by
+    # the workers on a host) first, so a crash loses at most one interval
+    view_tracking_enabled: bool = True
+    view_flush_seconds: float = 10
+    view_spill_path: str = "views.spill"
+
+    # Popular feed: the top POPULAR_FEED_SIZE posts of the last POPULAR_WINDOW_DAYS
+    # by views / (age_hours + 2) ** POPULAR_GRAVITY, recomputed on an interval
+    popular_refresh_seconds: float = 300
+    popular_feed_size: int = 200
+    popular_window_days: int = 7
+    popular_gravity: float = 1.8
+
+    # Response cache for anonymous reads
+    response_cache_enabled: bool = True
+    response_cache_backend: str = "memory"
+    response_cache_ttl_seconds: int = 30
+    response_cache_max_entries: int = 2048
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Cache-Control for public single-resource reads (published posts, profiles);
+    # revalidation is cheap (ETag / 304), so shared caches may hold them briefly
+    public_cache_control: str = "public, max-age=0, s-maxage=60, stale-while-revalidate=30"
+
+    # Largest id/username list accepted by the /batch lookups
+    batch_max_keys: int = 250
+
+    # Post revisions: every Nth is stored whole, the rest as deltas
+    revision_snapshot_interval: int = Field(20, gt=0)
+
+    # POST /posts/import: upload size and post count limits, and posts per transaction
+    import_max_bytes: int = 50 * 1024 * 1024
+    import_max_posts: int = 10000
+    import_batch_size: int = 500
+
+    # Slugs: bases with this many numbered copies get random suffixes instead
+    slug_max_numeric_suffix: int = 100
+    slug_insert_attempts: int = 5
+
+    # Query watch for dev/staging: "log" or "raise" on N+1 patterns (the same
+    # statement run this many times with different parameters in one request)
+    # and on statements slower than SLOW_QUERY_MS (logged with their EXPLAIN plan)
+    query_watch: str = "off"
+    query_watch_repeat_threshold: int = 5
+    slow_query_ms: float = 200
+
+    # App; DEBUG adds X-DB-Queries / Server-Timing to every response
+    debug: bool = False
     project_name: str = "Folio Blog API"
     api_v1_prefix: str = "/api/v1"
 
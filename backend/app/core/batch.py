@@ -0,0 +1,38 @@
+"""Helpers for the ``/batch`` lookups: parse the key list, answer in request order."""
+from typing import Callable, Hashable
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+def split_keys(values: list[str]) -> list[str]:
+    """Accept repeated and comma-separated query values; drop blanks and duplicates, keep order."""
+    keys = list(dict.fromkeys(k.strip() for v in values for k in v.split(",") if k.strip()))
+    if len(keys) > settings.batch_max_keys:
+        raise HTTPException(status_code=422, detail=f"At most {settings.batch_max_keys} keys per request")
+    return keys
+
+
+def parse_uuids(keys: list[str]) -> dict[str, UUID]:
+    """Map each well-formed key to its UUID; malformed keys are left out (and so reported missing)."""
+    parsed = {}
+    for key in keys:
+        try:
+            parsed[key] = UUID(key)
+        except ValueError:
+            pass
+    return parsed
+
+
+def in_request_order(keys: list[str], found: dict[Hashable, dict], lookup: Callable[[str], Hashable]) -> dict:
+    """``{"items": [...], "missing": [...]}`` with items in the order their keys were requested."""
+    items, missing = [], []
+    for key in keys:
+        item = found.get(lookup(key))
+        if item is None:
+            missing.append(key)
+        else:
+            items.append(item)
+    return {"items": items, "missing": missing}
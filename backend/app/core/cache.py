@@ -0,0 +1,179 @@
+"""Read-through cache for serialized public responses.
+
+Entries hold the rendered JSON bytes plus a snapshot of the version of every
+tag they depend on (``post:<id>``, ``author:<id>``, the list tag). Writers
+invalidate by bumping a tag version, which makes every entry recorded under an
+older version a miss, so no key scan is needed and the scheme works unchanged
+on a shared backend. Tag versions live outside the LRU so they are never
+evicted. A write racing a miss can still store a stale page; the TTL bounds
+how long it survives (and how stale other workers' in-process caches get).
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+LISTS_TAG = "posts:lists"
+
+
+def post_tag(post_id) -> str:
+    return f"post:{post_id}"
+
+
+def author_tag(author_id) -> str:
+    return f"author:{author_id}"
+
+
+def post_tags(posts) -> set[str]:
+    """Tags for a response embedding ``posts`` (and their authors)."""
+    tags = set()
+    for post in posts:
+        tags.add(post_tag(post.id))
+        tags.add(author_tag(post.author_id))
+    return tags
+
+
+class CacheBackend(ABC):
+    """Storage interface for :class:`ResponseCache`; values must be picklable for shared backends."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float, size: int = 1) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def counter(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count and (optionally) total size, with per-entry TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, _, value = item
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int = 1) -> None:
+        max_bytes = self.max_bytes if self.max_bytes is not None else float("inf")
+        if size > max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+    def _pop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, request: Request) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def get(self, key: str) -> Response | None:
+        if not self.enabled:
+            return None
+        entry = self.backend.get(key)
+        if entry is not None:
+            content, headers, versions = entry
+            if all(self.backend.counter(tag) == v for tag, v in versions.items()):
+                self.hits += 1
+                return Response(content=content, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+        self.misses += 1
+        return None
+
+    def store(self, key: str, content: bytes, tags: set[str], headers: dict | None = None) -> Response:
+        headers = dict(headers or {})
+        if self.enabled:
+            versions = {tag: self.backend.counter(tag) for tag in tags}
+            self.backend.set(key, (content, headers, versions), self.ttl, size=len(content))
+        return Response(content=content, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.backend.incr(tag)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, **self.backend.stats()}
+
+
+def _build_backend() -> CacheBackend:
+    if settings.response_cache_backend == "memory":
+        return MemoryCacheBackend(
+            max_entries=settings.response_cache_max_entries,
+            max_bytes=settings.response_cache_max_bytes,
+        )
+    raise ValueError(f"Unknown response cache backend: {settings.response_cache_backend}")
+
+
+response_cache = ResponseCache(
+    _build_backend(),
+    ttl=settings.response_cache_ttl_seconds,
+    enabled=settings.response_cache_enabled,
+)
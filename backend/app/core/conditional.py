@@ -0,0 +1,84 @@
+"""Validators (ETag / Last-Modified) and conditional GET for single-resource reads.
+
+ETags are strong and derived from ``updated_at`` (plus, for posts, the last
+body revision's ``revised_at`` and the author's ``updated_at``, since posts
+embed author data), so a handler can answer ``If-None-Match`` from a narrow
+``updated_at`` query before it loads or serializes the full row.
+Bump ``REPRESENTATION_VERSION`` whenever a response shape changes.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+REPRESENTATION_VERSION = 2
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(kind: str, resource_id, *versions) -> str:
+    raw = "|".join([str(REPRESENTATION_VERSION), kind, str(resource_id), *(str(v) for v in versions)])
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None, public: bool = True) -> dict[str, str]:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.public_cache_control if public else PRIVATE_CACHE_CONTROL,
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def post_validators(post_id, published_at, updated_at, revised_at, author_updated_at, *variant) -> dict[str, str]:
+    """Headers for a post response; drafts are only ever cacheable by their author's browser.
+
+    Autosaves move ``revised_at`` but not ``updated_at``, so both count. ``variant``
+    tells apart representations of the same post (e.g. rendered HTML and its renderer version).
+    """
+    etag = make_etag("post", post_id, updated_at, revised_at, author_updated_at, *variant)
+    last_modified = max((v for v in (updated_at, revised_at, author_updated_at) if v is not None), default=None)
+    return validator_headers(etag, last_modified, public=published_at is not None)
+
+
+def user_validators(user_id, updated_at, counts_changed_at, *counts: int) -> dict[str, str]:
+    """Profile headers; the denormalized counters move ``counts_changed_at``, not ``updated_at``."""
+    etag = make_etag("user", user_id, updated_at, *counts)
+    last_modified = max((v for v in (updated_at, counts_changed_at) if v is not None), default=None)
+    return validator_headers(etag, last_modified)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def has_validators(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, headers) -> bool:
+    """True when the client's copy matches ``headers`` (If-None-Match, else If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers["ETag"])
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if not (if_modified_since and last_modified):
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(headers) -> Response:
+    return Response(
+        status_code=304,
+        headers={k: v for k, v in headers.items() if k.lower() in ("etag", "cache-control", "last-modified")},
+    )
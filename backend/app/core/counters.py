@@ -0,0 +1,57 @@
+"""Denormalized per-user counters: followers, following and published posts.
+
+Writers adjust them with a relative ``UPDATE ... SET n = n + delta`` in the same
+transaction as the row they add or remove, so concurrent writers never lose an
+increment and a rollback undoes both together. ``updated_at`` is left alone
+(post ETags embed the author's, and a new follower shouldn't revalidate every
+post); the counters move ``counts_changed_at`` instead, which profile
+validators use alongside it. :func:`reconcile` recomputes every counter from
+the source tables to repair any drift.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+
+COUNTERS = ("follower_count", "following_count", "post_count")
+
+
+async def adjust(db: AsyncSession, user_id, **deltas: int) -> None:
+    """Add ``deltas`` (e.g. ``follower_count=1``) to a user's counters."""
+    values = {name: getattr(User, name) + delta for name, delta in deltas.items() if delta}
+    if not values:
+        return
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(**values, counts_changed_at=datetime.utcnow(), updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _actual_counts():
+    return {
+        "follower_count": select(func.count()).where(Follow.following_id == User.id).scalar_subquery(),
+        "following_count": select(func.count()).where(Follow.follower_id == User.id).scalar_subquery(),
+        "post_count": select(func.count())
+        .where(Post.author_id == User.id, Post.published_at.isnot(None))
+        .scalar_subquery(),
+    }
+
+
+async def reconcile(db: AsyncSession) -> int:
+    """Recompute every user's counters; returns how many users had drifted."""
+    actual = _actual_counts()
+    drifted = or_(*(getattr(User, name) != actual[name] for name in COUNTERS))
+    result = await db.execute(
+        update(User)
+        .where(drifted)
+        .values(**actual, counts_changed_at=datetime.utcnow(), updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -1,43 +1,245 @@
+import itertools
+import math
+import sqlite3
+import time
 import uuid
-from sqlalchemy import String, create_engine
+from fastapi import Request
+from sqlalchemy import LargeBinary, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.types import TypeDecorator
 
 from app.config import settings
+from app.core import metrics, querywatch
 
 
 class GUID(TypeDecorator):
-    """Stores UUID as string so it works with both SQLite and PostgreSQL."""
-    impl = String(36)
+    """UUID stored natively on PostgreSQL and as 16 raw bytes (BLOB) elsewhere."""
+    impl = LargeBinary(16)
     cache_ok = True
 
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
     def process_bind_param(self, value, dialect):
         if value is None:
             return None
-        return str(value) if isinstance(value, uuid.UUID) else value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
 
     def process_result_value(self, value, dialect):
         if value is None:
             return None
-        return uuid.UUID(value) if isinstance(value, str) else value
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=bytes(value))
 
 
-_connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    _connect_args["check_same_thread"] = False
+def async_database_url(url: str) -> str:
+    """Map a plain DATABASE_URL onto its asyncio driver (asyncpg / aiosqlite)."""
+    for prefix in ("postgresql://", "postgres://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+class PoolStats:
+    """Checkout counters for sizing the pool; ``wait`` includes any pre-ping or connect."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def as_dict(self, pool) -> dict:
+        stats = {
+            "pool": type(pool).__name__,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
 
-engine = create_engine(
-    settings.database_url,
-    connect_args=_connect_args,
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
 
-def get_db():
-    db = SessionLocal()
+
+def _engine_options(url) -> dict:
+    if _is_memory_sqlite(url):
+        # One shared connection (StaticPool); pool sizing doesn't apply.
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.close()
+
+
+def _sqlite_manual_transactions(dbapi_connection, connection_record):
+    # The sqlite3 driver's implicit transaction handling breaks SAVEPOINT
+    # (used for slug retries); let SQLAlchemy emit BEGIN itself instead.
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_math_functions(dbapi_connection, connection_record):
+    # power() (the popular feed's score) is only built in when SQLite was compiled with math functions.
+    cursor = dbapi_connection.cursor()
     try:
-        yield db
+        cursor.execute("SELECT power(2, 2)")
+    except sqlite3.OperationalError:
+        dbapi_connection.create_function("power", 2, math.pow, deterministic=True)
     finally:
-        db.close()
+        cursor.close()
+
+
+def _sqlite_begin(conn):
+    # Write transactions take the write lock up front. A deferred one that reads
+    # first can't upgrade its read lock while another writer is active, and that
+    # fails at once with "database is locked" (busy_timeout doesn't apply).
+    # Read-only engines (get_engine(read_only=True)) keep the deferred BEGIN.
+    if conn.get_execution_options().get("read_only"):
+        conn.exec_driver_sql("BEGIN")
+    else:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _count_connect(dbapi_connection, connection_record):
+    pool_stats.connects += 1
+
+
+def _count_checkin(dbapi_connection, connection_record):
+    pool_stats.checkins += 1
+
+
+def _create_engine(database_url: str) -> AsyncEngine:
+    url = make_url(async_database_url(database_url))
+    engine = create_async_engine(url, **_engine_options(url))
+    event.listen(engine.sync_engine, "connect", _count_connect)
+    event.listen(engine.sync_engine, "checkin", _count_checkin)
+    event.listen(engine.sync_engine, "before_cursor_execute", metrics.before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", metrics.after_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", querywatch.after_cursor_execute)
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_manual_transactions)
+        event.listen(engine.sync_engine, "connect", _sqlite_math_functions)
+        event.listen(engine.sync_engine, "begin", _sqlite_begin)
+        if not _is_memory_sqlite(url):
+            event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+_engine: AsyncEngine | None = None
+_read_only_engine: AsyncEngine | None = None
+_read_engines: list[AsyncEngine] | None = None
+_next_replica = itertools.count()
+# Objects stay loaded after commit: attribute access can't lazily hit the
+# database from async code, so handlers reuse what they already loaded.
+# Bound to the engine by get_engine().
+SessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+Base = declarative_base()
+
+
+def get_engine(read_only: bool = False) -> AsyncEngine:
+    """The process-wide engine, created on first use rather than at import.
+
+    Importing the app (a worker boot, a test collection, ``alembic``) never
+    loads a driver or opens a pool; the lifespan handler or CLI calls this first.
+    ``read_only`` gives the same pool for sessions that never write, so on
+    SQLite they don't take the write lock.
+    """
+    global _engine, _read_only_engine
+    if _engine is None:
+        _engine = _create_engine(settings.database_url)
+        _read_only_engine = _engine.execution_options(read_only=True)
+        SessionLocal.configure(bind=_engine)
+    return _read_only_engine if read_only else _engine
+
+
+def get_read_engine() -> AsyncEngine:
+    """A replica engine, round-robin over ``READ_DATABASE_URL``; the primary when none are set."""
+    global _read_engines
+    if _read_engines is None:
+        _read_engines = [
+            _create_engine(url).execution_options(read_only=True) for url in settings.read_database_url
+        ]
+    if not _read_engines:
+        return get_engine(read_only=True)
+    return _read_engines[next(_next_replica) % len(_read_engines)]
+
+
+async def dispose_engine() -> None:
+    global _engine, _read_only_engine, _read_engines
+    for engine in (_engine, *(_read_engines or ())):
+        if engine is not None:
+            await engine.dispose()
+    _engine = _read_only_engine = _read_engines = None
+
+
+def __getattr__(name):
+    # ``from app.core.database import engine`` keeps working for scripts.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def get_db(request: Request):
+    """Session on the primary; read-only for GET/HEAD/OPTIONS (e.g. loading the caller for a read)."""
+    engine = get_engine(read_only=request.method in ("GET", "HEAD", "OPTIONS"))
+    async with SessionLocal(bind=engine) as db:
+        yield db
@@ -0,0 +1,257 @@
+"""Bulk post import (``POST /posts/import``).
+
+The upload is NDJSON, one post per line. A ``GET /users/me/export`` file
+works as-is, because lines whose ``type`` isn't ``post`` are skipped. It can
+also be a zip of markdown files with ``key: value`` front matter (``title``,
+``date``, ``slug``, ``draft``, ``cover_image``).
+
+Posts are written ``import_batch_size`` at a time, one transaction per batch:
+
+- one query per batch allocates the slugs;
+- the rows, with summary and rendered HTML precomputed, go in with a single
+  executemany ``INSERT``;
+- search, timelines and counters are updated in bulk.
+
+Original publish dates are kept.
+
+Results stream back as NDJSON: an ``item`` line per post in upload order
+(``created`` with its id and slug, or ``error``), a ``progress`` line after
+each batch, and a final ``summary``. A batch that fails in the database is rolled back, its
+posts are reported as errors and the import moves on to the next batch; the
+``summary`` line is always written, with an ``error`` if the import stopped
+early.
+"""
+import itertools
+import logging
+import re
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Iterator
+
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core import counters, search, timeline
+from app.core.cache import LISTS_TAG, response_cache
+from app.core.database import SessionLocal
+from app.core.principal import invalidate_user
+from app.core.render import apply_render
+from app.core.slug import allocate_slugs, slugify
+from app.core.summary import apply_summary
+from app.models.post import Post
+from app.schemas.post import PostImport
+
+logger = logging.getLogger(__name__)
+MEDIA_TYPE = "application/x-ndjson"
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl", "application/json"}
+ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+_FRONT_MATTER = re.compile(r"\A---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)", re.S)
+_HEADING = re.compile(r"^#\s+(.+)$", re.M)
+_FALSE = {"false", "no", "0", ""}
+
+# Left to their column defaults (the transient Post has None for them).
+_COLUMN_DEFAULTS = ("view_count", "revision")
+
+Items = Iterator[tuple[str, dict | Exception]]
+
+
+async def spool(request: Request):
+    """Copy the request body to a temporary file (in memory while small), enforcing ``import_max_bytes``."""
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.import_max_bytes:
+            upload.close()
+            raise HTTPException(status_code=413, detail=f"Uploads are limited to {settings.import_max_bytes} bytes")
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+def ndjson_items(upload) -> Items:
+    with upload:
+        for number, line in enumerate(upload, 1):
+            if not line.strip():
+                continue
+            source = f"line {number}"
+            try:
+                data = orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                yield source, exc
+                continue
+            if not isinstance(data, dict):
+                yield source, ValueError("expected a JSON object")
+            elif data.get("type", "post") == "post":
+                yield source, data
+
+
+def parse_markdown(text: str, name: str) -> dict:
+    """A post from a markdown file with optional front matter; the title falls back to the first heading."""
+    data = {}
+    match = _FRONT_MATTER.match(text)
+    if match:
+        for line in match.group(1).splitlines():
+            key, sep, value = line.partition(":")
+            if sep and key.strip():
+                data[key.strip().lower()] = value.strip().strip("'\"")
+        text = text[match.end():]
+    post = {
+        "title": data.get("title") or next(iter(_HEADING.findall(text)), None) or PurePosixPath(name).stem,
+        "body": text.strip("\n"),
+        "slug": data.get("slug") or None,
+        "published_at": data.get("published_at") or data.get("date") or None,
+        "cover_image_url": data.get("cover_image_url") or data.get("cover_image") or None,
+    }
+    if "draft" in data:
+        post["published"] = data["draft"].lower() in _FALSE
+    elif "published" in data:
+        post["published"] = data["published"].lower() not in _FALSE
+    return post
+
+
+def zip_items(upload) -> Items:
+    with upload, zipfile.ZipFile(upload) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(MARKDOWN_SUFFIXES):
+                continue
+            # file_size comes from the archive itself, so a zip bomb is refused before it's inflated.
+            if info.file_size > settings.import_max_bytes:
+                yield name, ValueError("file too large")
+                continue
+            try:
+                post = parse_markdown(archive.read(info).decode("utf-8-sig"), name)
+            except (UnicodeDecodeError, zipfile.BadZipFile) as exc:
+                yield name, exc
+            else:
+                yield name, post
+
+
+class SlugsExhausted(Exception):
+    """Every ``slug_insert_attempts`` try at a batch lost a slug race."""
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _row(author_id, item: PostImport, now: datetime) -> dict:
+    if item.published is False:
+        published_at = None
+    else:
+        published_at = _utc(item.published_at) or (now if item.published else None)
+    post = Post(
+        id=uuid.uuid4(),
+        author_id=author_id,
+        title=item.title,
+        body=item.body,
+        body_format=item.body_format,
+        cover_image_url=item.cover_image_url,
+        published_at=published_at,
+        created_at=_utc(item.created_at) or published_at or now,
+    )
+    post.updated_at = _utc(item.updated_at) or post.created_at
+    apply_summary(post)
+    apply_render(post)
+    return {c.key: getattr(post, c.key) for c in Post.__table__.columns if c.key not in _COLUMN_DEFAULTS}
+
+
+async def _insert(db: AsyncSession, author_id, items: list[PostImport]) -> list[dict]:
+    """Insert one batch and everything derived from it, in one transaction."""
+    now = datetime.utcnow()
+    rows = [_row(author_id, item, now) for item in items]
+    bases = [slugify(item.slug or item.title) for item in items]
+    for _ in range(settings.slug_insert_attempts):
+        for row, slug in zip(rows, await allocate_slugs(db, bases)):
+            row["slug"] = slug
+        try:
+            await db.execute(insert(Post), rows)
+            break
+        except IntegrityError as exc:
+            await db.rollback()
+            if "slug" not in str(exc.orig):
+                raise
+    else:
+        raise SlugsExhausted("could not allocate unique slugs for this batch")
+    await search.index_posts(db, [(row["id"], row["title"], row["body"]) for row in rows])
+    published = [row["id"] for row in rows if row["published_at"]]
+    await timeline.publish_posts(db, author_id, published)
+    await counters.adjust(db, author_id, post_count=len(published))
+    await db.commit()
+    return rows
+
+
+def _line(kind: str, **data) -> bytes:
+    return orjson.dumps({"type": kind, **data}) + b"\n"
+
+
+def _error(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'post'}: {e['msg']}" for e in exc.errors())
+    return str(exc)
+
+
+async def _import_batch(db: AsyncSession, author_id, valid: list) -> tuple[list[bytes], int]:
+    """Insert one batch; returns its item lines and the posts created (none if the batch was rolled back)."""
+    try:
+        rows = await _insert(db, author_id, [item for _, item in valid])
+    except (SQLAlchemyError, SlugsExhausted) as exc:
+        await db.rollback()
+        logger.warning("import batch of %d posts rolled back", len(valid), exc_info=True)
+        error = f"batch rolled back: {exc}" if isinstance(exc, SlugsExhausted) else "batch rolled back: database error"
+        return [_line("item", source=source, status="error", error=error) for source, _ in valid], 0
+    # Per batch: a client that disconnects mid-stream stops the import after a commit.
+    invalidate_user(author_id)
+    response_cache.invalidate(LISTS_TAG)
+    return [
+        _line("item", source=source, status="created", id=row["id"], slug=row["slug"])
+        for (source, _), row in zip(valid, rows)
+    ], len(rows)
+
+
+async def import_posts(author_id, items: Items) -> AsyncIterator[bytes]:
+    created = failed = 0
+    items = iter(items)
+    try:
+        async with SessionLocal() as db:
+            while batch := list(itertools.islice(items, settings.import_batch_size)):
+                # One slot per upload item, so results stream back in upload order.
+                lines, valid, slots = [b""] * len(batch), [], []
+                for slot, (source, data) in enumerate(batch):
+                    if created + failed + len(valid) >= settings.import_max_posts:
+                        lines[slot] = _line("item", source=source, status="error", error="import_max_posts reached")
+                        failed += 1
+                        continue
+                    try:
+                        if isinstance(data, Exception):
+                            raise data
+                        valid.append((source, PostImport.model_validate(data)))
+                        slots.append(slot)
+                    except (ValidationError, ValueError, zipfile.BadZipFile) as exc:
+                        lines[slot] = _line("item", source=source, status="error", error=_error(exc))
+                        failed += 1
+                if valid:
+                    item_lines, inserted = await _import_batch(db, author_id, valid)
+                    for slot, line in zip(slots, item_lines):
+                        lines[slot] = line
+                    created += inserted
+                    failed += len(valid) - inserted
+                yield b"".join(lines) + _line("progress", created=created, failed=failed)
+    except Exception:
+        # Nothing left to send but the summary: the status line went out with the first chunk.
+        logger.exception("import stopped after %d posts", created + failed)
+        yield _line("summary", created=created, failed=failed, error="import stopped early")
+        return
+    yield _line("summary", created=created, failed=failed)
@@ -0,0 +1,195 @@
+"""Request and SQL metrics in the Prometheus text format.
+
+:class:`MetricsMiddleware` times every HTTP request and labels it with the
+matched route template (``/api/v1/posts/{post_id}``, never the raw path), so
+label cardinality stays bounded. The engine's cursor events (see
+``app/core/database.py``) add each statement and its duration to the current
+request's :class:`RequestStats`, found through a context variable, and the
+middleware rolls those into per-route totals when the response is done. With
+``DEBUG=true`` responses also carry ``X-DB-Queries`` and ``Server-Timing``.
+
+Metrics live in process memory, like the response cache: each worker exposes
+its own and Prometheus sums them.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+
+from app.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, _labels(self.labels, labels), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float) -> None:
+        self.values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, *labels, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self):
+        names = self.labels + ("le",)
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _labels(names, (*labels, bound)), cumulative
+            yield f"{self.name}_sum", _labels(self.labels, labels), total
+            yield f"{self.name}_count", _labels(self.labels, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, extra=()) -> str:
+        lines = []
+        for metric in (*self.metrics, *extra):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+ROUTE = ("method", "route")
+requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests by route and status.", ROUTE + ("status",))
+)
+request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ROUTE)
+)
+requests_in_flight = registry.register(Gauge("http_requests_in_flight", "HTTP requests being served."))
+db_queries_total = registry.register(Counter("db_queries_total", "SQL statements executed, by route.", ROUTE))
+db_seconds_total = registry.register(
+    Counter("db_query_seconds_total", "Time spent executing SQL statements, by route.", ROUTE)
+)
+db_queries_per_request = registry.register(
+    Histogram("db_queries_per_request", "SQL statements per HTTP request.", ROUTE, QUERY_BUCKETS)
+)
+requests_in_flight.set(value=0)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - context.query_started
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f"app;dur={total_seconds * 1000:.1f}"
+    )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no extra task per request, unlike ``BaseHTTPMiddleware``)."""
+
+    def __init__(self, app, debug: bool | None = None):
+        self.app = app
+        self.debug = settings.debug if debug is None else debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.debug:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.queries).encode()))
+                    timing = server_timing(stats, time.perf_counter() - started)
+                    headers.append((b"server-timing", timing.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        requests_in_flight.inc(amount=1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.inc(amount=-1)
+            current_request.reset(token)
+            labels = (scope["method"], _route_label(scope))
+            requests_total.inc(*labels, str(status))
+            request_duration.observe(*labels, value=time.perf_counter() - started)
+            db_queries_total.inc(*labels, amount=stats.queries)
+            db_seconds_total.inc(*labels, amount=stats.db_seconds)
+            db_queries_per_request.observe(*labels, value=stats.queries)
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+from app.models.post import Post
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def encode_cursor(published_at: datetime, post_id: UUID) -> str:
+    return _encode([published_at.isoformat(), str(post_id)])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        published_at, post_id = _decode(cursor)
+        return datetime.fromisoformat(published_at), UUID(post_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(score: float, post_id: UUID) -> str:
+    """Cursor for relevance-ordered results; floats survive the JSON round trip exactly."""
+    return _encode([score, str(post_id)])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, UUID]:
+    try:
+        score, post_id = _decode(cursor)
+        return float(score), UUID(post_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate_posts(q, limit: int, offset: int = 0, cursor: str | None = None, keys=None):
+    """Order a published-post query newest first and apply cursor or offset paging.
+
+    With a cursor the query seeks past the last seen (published_at, id) pair, so
+    it is served straight from the composite indexes regardless of page depth.
+    ``keys`` overrides the (published_at, id) columns, e.g. to page a join on
+    another table's index.
+    """
+    published_col, id_col = keys or (Post.published_at, Post.id)
+    q = q.order_by(published_col.desc(), id_col.desc())
+    if cursor:
+        published_at, post_id = decode_cursor(cursor)
+        q = q.filter(tuple_(published_col, id_col) < (published_at, post_id))
+    elif offset:
+        q = q.offset(offset)
+    return q.limit(limit)
+
+
+def next_cursor_headers(rows: list, limit: int, keys: tuple[str, str] = ("published_at", "id")) -> dict[str, str]:
+    """Cursor header for a full page; ``keys`` name the (datetime, id) attributes it was ordered by."""
+    if len(rows) == limit and rows:
+        last = rows[-1]
+        return {NEXT_CURSOR_HEADER: encode_cursor(getattr(last, keys[0]), getattr(last, keys[1]))}
+    return {}
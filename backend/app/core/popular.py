@@ -0,0 +1,84 @@
+"""The popular feed: posts ranked by time-decayed readership, precomputed.
+
+Every ``popular_refresh_seconds`` :func:`refresh` scores the posts published
+in the last ``popular_window_days`` as ``views / (age_hours + 2) ** gravity``
+in SQL (``ORDER BY`` score ``LIMIT`` ``popular_feed_size``, so only the top
+rows leave the database) and rewrites ``popular_posts`` with them by rank, so
+``GET /feed/popular`` is a rank-ordered join and never sorts by a computed
+score. A worker skips the refresh when another one has just done it.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, case, delete, extract, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import response_cache
+from app.core.database import SessionLocal
+from app.models.popular import PopularPost
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+POPULAR_TAG = "posts:popular"
+
+
+def _age_hours(dialect_name: str, now: datetime):
+    if dialect_name == "postgresql":
+        return extract("epoch", literal(now, DateTime) - Post.published_at) / 3600
+    return (func.julianday(literal(now, DateTime)) - func.julianday(Post.published_at)) * 24
+
+
+def score(dialect_name: str, now: datetime):
+    """``views / (age_hours + 2) ** gravity`` as a SQL expression (a future publish date counts as age 0)."""
+    age_hours = _age_hours(dialect_name, now)
+    age_hours = case((age_hours < 0, 0), else_=age_hours)
+    return Post.view_count / func.power(age_hours + 2, settings.popular_gravity)
+
+
+async def refresh(db: AsyncSession, force: bool = True) -> int | None:
+    """Recompute ``popular_posts``; returns the posts ranked, or None when skipped as fresh."""
+    now = datetime.utcnow()
+    if not force:
+        computed_at = await db.scalar(select(func.max(PopularPost.computed_at)))
+        if computed_at and now - computed_at < timedelta(seconds=settings.popular_refresh_seconds / 2):
+            return None
+    # The database scores and sorts the window; only the top popular_feed_size rows come back.
+    scored = score(db.bind.dialect.name, now).label("score")
+    ranked = (
+        await db.execute(
+            select(Post.id, scored)
+            .where(Post.published_at >= now - timedelta(days=settings.popular_window_days), Post.view_count > 0)
+            .order_by(scored.desc(), Post.id)
+            .limit(settings.popular_feed_size)
+        )
+    ).all()
+    await db.execute(delete(PopularPost))
+    if ranked:
+        await db.execute(
+            insert(PopularPost),
+            [
+                {"rank": rank, "post_id": post_id, "score": value, "computed_at": now}
+                for rank, (post_id, value) in enumerate(ranked, 1)
+            ],
+        )
+    await db.commit()
+    response_cache.invalidate(POPULAR_TAG)
+    return len(ranked)
+
+
+async def remove_post(db: AsyncSession, post_id) -> None:
+    """Drop a deleted post from the ranking (unpublished ones are filtered at read time)."""
+    await db.execute(delete(PopularPost).where(PopularPost.post_id == post_id))
+
+
+async def run() -> None:
+    """Refresh every ``popular_refresh_seconds`` until cancelled (the table survives restarts)."""
+    while True:
+        await asyncio.sleep(settings.popular_refresh_seconds)
+        try:
+            async with SessionLocal() as db:
+                await refresh(db, force=False)
+        except Exception:
+            logger.exception("popular feed refresh failed")
@@ -0,0 +1,30 @@
+"""Bounded TTL cache of authenticated users, so auth doesn't cost a query per request.
+
+Cached rows are detached from any session: read their columns freely, but
+re-load the user (``db.get``) before changing it, and call
+:func:`invalidate_user` after the change commits.
+"""
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import MemoryCacheBackend
+from app.models.user import User
+
+_users = MemoryCacheBackend(max_entries=settings.user_cache_max_entries)
+
+
+async def load_user(db: AsyncSession, user_id: UUID) -> User | None:
+    user = _users.get(str(user_id))
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        db.expunge(user)
+        _users.set(str(user_id), user, settings.user_cache_ttl_seconds)
+    return user
+
+
+def invalidate_user(user_id: UUID) -> None:
+    _users.delete(str(user_id))
@@ -0,0 +1,161 @@
+"""N+1 and slow-query detection for development, staging and tests.
+
+A :class:`QueryWatch` records every statement the engine runs while it is
+active. It then reports:
+
+- N+1 patterns: the same SQL text run ``repeat_threshold`` or more times with
+  different parameters, which is the shape of a lazy load per row.
+- Slow queries over ``slow_query_ms``, each with its ``EXPLAIN`` plan captured
+  on the same connection right after it ran.
+
+With ``QUERY_WATCH=log`` or ``raise``, :class:`QueryWatchMiddleware` watches
+every request and logs the issues or raises :class:`QueryIssuesFound`. A
+TestClient re-raises that into the test. :func:`watch_queries` does the same
+around any block, and ``app/pytest_plugin.py`` wraps it as a query-budget
+fixture.
+"""
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.config import settings
+
+logger = logging.getLogger("app.querywatch")
+_EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+_EXPLAINABLE = ("SELECT", "WITH")
+
+
+@dataclass
+class Statement:
+    sql: str
+    parameters: object
+    seconds: float
+    plan: str | None = None
+
+
+@dataclass
+class QueryWatch:
+    repeat_threshold: int = field(default_factory=lambda: settings.query_watch_repeat_threshold)
+    slow_query_ms: float = field(default_factory=lambda: settings.slow_query_ms)
+    statements: list[Statement] = field(default_factory=list)
+
+    def n_plus_one(self) -> list[tuple[str, int]]:
+        """(sql, executions) for statements repeated with different parameters."""
+        runs: dict[str, list] = defaultdict(list)
+        for statement in self.statements:
+            runs[statement.sql].append(repr(statement.parameters))
+        return [
+            (sql, len(params))
+            for sql, params in runs.items()
+            if len(params) >= self.repeat_threshold and len(set(params)) > 1
+        ]
+
+    def slow(self) -> list[Statement]:
+        return [s for s in self.statements if s.seconds * 1000 >= self.slow_query_ms]
+
+    def issues(self) -> list[str]:
+        found = [f"N+1: {count} executions of {_short(sql)}" for sql, count in self.n_plus_one()]
+        for statement in self.slow():
+            plan = f"\n{statement.plan}" if statement.plan else ""
+            found.append(f"slow query ({statement.seconds * 1000:.0f} ms): {_short(statement.sql)}{plan}")
+        return found
+
+
+class QueryIssuesFound(AssertionError):
+    """Raised in ``raise`` mode, or when a query budget is exceeded."""
+
+
+_current: ContextVar[QueryWatch | None] = ContextVar("query_watch", default=None)
+# Watches opened with watch_queries() see statements from every thread: a
+# TestClient serves requests on its own event-loop thread.
+_global: list[QueryWatch] = []
+
+
+def _short(sql: str, limit: int = 300) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= limit else sql[:limit] + "…"
+
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    prefix = _EXPLAIN.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    # A raw DBAPI cursor, so the EXPLAIN itself isn't recorded or counted.
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        # SQLite rows are (id, parent, notused, detail); Postgres rows are one line each.
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as exc:  # the plan is diagnostic only; never fail the query over it
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        cursor.close()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    watches = _global + ([w] if (w := _current.get()) is not None else [])
+    if not watches:
+        return
+    seconds = time.perf_counter() - context.query_started
+    recorded = Statement(statement, parameters, seconds)
+    if not executemany and any(seconds * 1000 >= w.slow_query_ms for w in watches):
+        recorded.plan = _explain(conn, statement, parameters)
+    for watch in watches:
+        watch.statements.append(recorded)
+
+
+def report(watch: QueryWatch, where: str, mode: str) -> None:
+    issues = watch.issues()
+    if not issues:
+        return
+    if mode == "raise":
+        raise QueryIssuesFound(f"{where}:\n" + "\n".join(issues))
+    for issue in issues:
+        logger.warning("%s: %s", where, issue)
+
+
+@contextmanager
+def watch_queries(max_queries: int | None = None, allow_n_plus_one: bool = False, **options):
+    """Record statements run inside the block (from any thread) and enforce a budget on exit.
+
+    Raises :class:`QueryIssuesFound` when more than ``max_queries`` statements
+    ran or, unless ``allow_n_plus_one``, when an N+1 pattern showed up.
+    ``options`` override ``repeat_threshold`` / ``slow_query_ms``.
+    """
+    watch = QueryWatch(**options)
+    _global.append(watch)
+    try:
+        yield watch
+    finally:
+        _global.remove(watch)
+    problems = []
+    if max_queries is not None and len(watch.statements) > max_queries:
+        statements = "\n".join(_short(s.sql, 120) for s in watch.statements)
+        problems.append(f"{len(watch.statements)} queries, budget {max_queries}:\n{statements}")
+    if not allow_n_plus_one:
+        problems += [f"N+1: {count} executions of {_short(sql)}" for sql, count in watch.n_plus_one()]
+    if problems:
+        raise QueryIssuesFound("\n".join(problems))
+
+
+class QueryWatchMiddleware:
+    """Watches every HTTP request; added by ``create_app`` when ``QUERY_WATCH`` is ``log`` or ``raise``."""
+
+    def __init__(self, app, mode: str | None = None):
+        self.app = app
+        self.mode = mode or settings.query_watch
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        watch = QueryWatch()
+        token = _current.set(watch)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+        report(watch, f"{scope['method']} {scope['path']}", self.mode)
@@ -0,0 +1,70 @@
+"""Sanitized HTML for post bodies, rendered once when a post is written.
+
+``markdown`` bodies go through markdown-it (CommonMark plus tables and
+strikethrough), ``html`` bodies are taken as-is, and anything else is treated
+as plain text; every result is then sanitized with nh3, so the stored HTML is
+safe to insert into a page. ``posts.body_html_hash`` records which body,
+format and renderer produced ``body_html``: :func:`apply_render` skips work
+when it still matches, and bumping ``RENDERER_VERSION`` (new renderer options
+or sanitizer rules) makes every stored render stale for
+``python -m app.cli render-bodies``. Reads check the hash as well (see
+:func:`html_for`), so a stale row is rendered on the fly rather than served.
+"""
+import functools
+import hashlib
+import html
+
+from app.models.post import Post
+
+RENDERER_VERSION = 1
+LINK_REL = "noopener noreferrer nofollow ugc"
+
+
+def content_hash(body: str, body_format: str | None) -> str:
+    raw = f"{RENDERER_VERSION}\x00{body_format or 'markdown'}\x00{body}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+@functools.cache
+def _markdown():
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark", {"html": True}).enable(["table", "strikethrough"])
+
+
+@functools.cache
+def _attributes() -> dict[str, set[str]]:
+    import nh3
+
+    # Keep fenced-code languages ("language-python") for client-side highlighting.
+    return {**nh3.ALLOWED_ATTRIBUTES, "code": {"class"}}
+
+
+def render_body(body: str, body_format: str | None) -> str:
+    import nh3
+
+    if body_format in (None, "markdown"):
+        raw = _markdown().render(body)
+    elif body_format == "html":
+        raw = body
+    else:
+        paragraphs = (html.escape(p).replace("\n", "<br>") for p in body.split("\n\n") if p.strip())
+        raw = "".join(f"<p>{p}</p>" for p in paragraphs)
+    return nh3.clean(raw, attributes=_attributes(), link_rel=LINK_REL)
+
+
+def apply_render(post: Post) -> bool:
+    """Refresh ``post.body_html`` unless the stored render is current; returns whether it rendered."""
+    key = content_hash(post.body or "", post.body_format)
+    if post.body_html_hash == key and post.body_html is not None:
+        return False
+    post.body_html = render_body(post.body or "", post.body_format)
+    post.body_html_hash = key
+    return True
+
+
+def html_for(body: str, body_format: str | None, body_html: str | None, body_html_hash: str | None) -> str:
+    """The stored render when it is current for this body, otherwise a fresh one."""
+    if body_html is not None and body_html_hash == content_hash(body, body_format):
+        return body_html
+    return render_body(body, body_format)
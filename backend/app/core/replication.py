@@ -0,0 +1,66 @@
+"""Read-your-writes for replica routing, carried by the client.
+
+After a user's write, :class:`LastWriteMiddleware` returns an ``X-Last-Write``
+header: the write time signed with ``SECRET_KEY`` and bound to the user id.
+A client that sends it back on its next requests has its reads served by the
+primary for ``READ_YOUR_WRITES_SECONDS``, whichever worker takes them, so no
+worker needs to remember who wrote. A missing, expired, forged or other
+user's marker reads from a replica.
+"""
+import hashlib
+import hmac
+import time
+
+from fastapi import Request
+
+from app.config import settings
+
+LAST_WRITE_HEADER = "X-Last-Write"
+_STATE_KEY = "last_write"
+
+
+def _sign(user_id, millis: str) -> str:
+    message = f"{user_id}:{millis}".encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def write_marker(user_id, at: float | None = None) -> str:
+    millis = str(int((time.time() if at is None else at) * 1000))
+    return f"{millis}.{_sign(user_id, millis)}"
+
+
+def wrote_recently(marker: str | None, user_id) -> bool:
+    """Whether ``marker`` is ``user_id``'s own and younger than ``READ_YOUR_WRITES_SECONDS``."""
+    if not marker:
+        return False
+    millis, _, signature = marker.partition(".")
+    if not millis.isdigit() or not hmac.compare_digest(signature, _sign(user_id, millis)):
+        return False
+    return time.time() - int(millis) / 1000 < settings.read_your_writes_seconds
+
+
+def set_last_write(request: Request, user_id) -> None:
+    """Have this request's response carry a fresh marker for ``user_id``."""
+    setattr(request.state, _STATE_KEY, write_marker(user_id))
+
+
+class LastWriteMiddleware:
+    """Adds ``X-Last-Write`` to responses whose handler marked a write; added by ``create_app`` with replicas."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                marker = scope.get("state", {}).get(_STATE_KEY)
+                if marker:
+                    headers = [*message.get("headers", []), (LAST_WRITE_HEADER.lower().encode(), marker.encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,125 @@
+"""Post body revisions: delta autosave and revision history.
+
+An autosave sends text operations against a base revision in the ot.js JSON
+form: a positive int retains that many characters, a negative int deletes
+that many, and a string is inserted. Text left over at the end is retained.
+Lengths count UTF-16 code units, the way browser editors measure text.
+
+``posts.body`` is always the newest revision (``posts.revision``). Row *k* of
+``post_revisions`` holds revision *k* in one of two forms:
+
+- a reverse delta that turns revision *k + 1* back into *k*. It is computed
+  while the forward ops are applied, so it costs nothing extra;
+- a full snapshot, written every ``revision_snapshot_interval`` revisions
+  and whenever the body is replaced outright.
+
+Reading revision *k* starts from the first snapshot at or after *k* (or the
+current body) and walks back through at most that many deltas. A post that
+is never edited stores no revisions at all.
+"""
+from datetime import datetime
+
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.revision import PostRevision
+
+Ops = list[int | str]
+
+
+class InvalidOps(ValueError):
+    """The ops don't fit the base text (or would split a surrogate pair)."""
+
+
+def _decode(units: bytes) -> str:
+    try:
+        return units.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise InvalidOps("ops split a UTF-16 surrogate pair") from None
+
+
+def apply_ops(text: str, ops: Ops) -> tuple[str, Ops]:
+    """Apply ``ops`` to ``text``; returns the new text and the ops that turn it back into ``text``."""
+    units = text.encode("utf-16-le")
+    pieces, undo, pos = [], [], 0
+    for op in ops:
+        if isinstance(op, str):
+            if not op:
+                continue  # an empty insert is a no-op; recording it would store a 0 (invalid) undo op
+            encoded = op.encode("utf-16-le")
+            pieces.append(encoded)
+            undo.append(-(len(encoded) // 2))
+            continue
+        if isinstance(op, bool) or not isinstance(op, int) or op == 0:
+            raise InvalidOps(f"invalid op {op!r}")
+        end = pos + abs(op) * 2
+        if end > len(units):
+            raise InvalidOps(f"ops run past the end of the text ({len(units) // 2} characters)")
+        if op > 0:
+            pieces.append(units[pos:end])
+            undo.append(op)
+        else:
+            undo.append(_decode(units[pos:end]))
+        pos = end
+    pieces.append(units[pos:])
+    if undo and isinstance(undo[-1], int) and undo[-1] > 0:
+        undo.pop()  # a trailing retain is implied
+    return _decode(b"".join(pieces)), undo
+
+
+def is_snapshot(revision: int) -> bool:
+    return revision % settings.revision_snapshot_interval == 0
+
+
+async def record(
+    db: AsyncSession, post_id, revision: int, created_at: datetime, body: str | None = None, undo: Ops | None = None
+) -> None:
+    """Store the revision being replaced: ``body`` as a snapshot, otherwise the ``undo`` delta."""
+    delta = None if body is not None else orjson.dumps(undo).decode()
+    await db.execute(
+        insert(PostRevision).values(
+            post_id=post_id, revision=revision, body=body, delta=delta, created_at=created_at
+        )
+    )
+
+
+async def history(db: AsyncSession, post_id, before: int, limit: int) -> list:
+    """``(revision, created_at, snapshot)`` rows below ``before``, newest first."""
+    rows = await db.execute(
+        select(PostRevision.revision, PostRevision.created_at, PostRevision.body.isnot(None).label("snapshot"))
+        .where(PostRevision.post_id == post_id, PostRevision.revision < before)
+        .order_by(PostRevision.revision.desc())
+        .limit(limit)
+    )
+    return rows.all()
+
+
+async def body_at(db: AsyncSession, post_id, revision: int, head_revision: int, head_body: str) -> str | None:
+    """The body as of ``revision``, or None if that revision isn't stored.
+
+    Raises :class:`InvalidOps` when a stored delta doesn't apply on the way back.
+    """
+    if revision == head_revision:
+        return head_body
+    start = await db.scalar(
+        select(PostRevision.revision)
+        .where(PostRevision.post_id == post_id, PostRevision.revision >= revision, PostRevision.body.isnot(None))
+        .order_by(PostRevision.revision)
+        .limit(1)
+    )
+    end = head_revision - 1 if start is None else start
+    rows = (
+        await db.execute(
+            select(PostRevision.revision, PostRevision.body, PostRevision.delta)
+            .where(PostRevision.post_id == post_id, PostRevision.revision.between(revision, end))
+            .order_by(PostRevision.revision.desc())
+        )
+    ).all()
+    if not rows or rows[-1].revision != revision or len(rows) != end - revision + 1:
+        return None
+    text = head_body
+    for row in rows:
+        text = row.body if row.body is not None else apply_ops(text, orjson.loads(row.delta))[0]
+    return text
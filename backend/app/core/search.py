@@ -0,0 +1,191 @@
+"""Full-text search over post titles and bodies.
+
+PostgreSQL keeps a generated ``posts.search_vector`` tsvector (title weighted
+above body) behind a GIN index, so the database maintains it on every write
+and :func:`index_post` / :func:`remove_post` are no-ops there. SQLite uses an
+FTS5 table, ``post_search``, whose integer rowids map to post ids through
+``post_search_docs``. The post handlers keep it in step in the same transaction.
+
+Neither table is declared on ``Base.metadata``; migration 0003 creates them.
+Results are ranked (``ts_rank_cd`` / ``bm25``), paged by a (score, id) keyset
+and carry an HTML-escaped snippet with matches wrapped in ``<mark>``.
+"""
+import html
+import re
+from uuid import UUID
+
+from sqlalchemy import Float, bindparam, column, delete, func, insert, literal_column, select, table, text, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import GUID
+from app.core.pagination import decode_rank_cursor
+from app.core.summary import plain_text
+from app.models.post import Post
+
+TS_CONFIG = "english"
+SNIPPET_WORDS = 24
+# Control characters mark matches inside the raw snippet so the text can be
+# escaped before the <mark> tags go in.
+_START, _STOP = "\x02", "\x03"
+_TOKEN = re.compile(r"\w+")
+
+search_vector = literal_column("posts.search_vector", TSVECTOR)
+post_search = table("post_search", column("rowid"), column("title"), column("body"))
+post_search_docs = table("post_search_docs", column("doc_id"), column("post_id", GUID()))
+
+
+def _is_postgresql(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+async def remove_post(db: AsyncSession, post_id) -> None:
+    if _is_postgresql(db):
+        return
+    doc_id = await db.scalar(select(post_search_docs.c.doc_id).where(post_search_docs.c.post_id == post_id))
+    if doc_id is not None:
+        await db.execute(delete(post_search).where(post_search.c.rowid == doc_id))
+        await db.execute(delete(post_search_docs).where(post_search_docs.c.doc_id == doc_id))
+
+
+async def index_post(db: AsyncSession, post: Post) -> None:
+    """(Re)index a post's title and body; call after the post has been flushed."""
+    await reindex(db, post.id, post.title, post.body)
+
+
+async def reindex(db: AsyncSession, post_id, title: str, body: str | None) -> None:
+    if _is_postgresql(db):
+        return
+    await remove_post(db, post_id)
+    await _add(db, post_id, title, body)
+
+
+async def _add(db: AsyncSession, post_id, title: str, body: str | None) -> None:
+    doc_id = (await db.execute(insert(post_search_docs).values(post_id=post_id))).lastrowid
+    await db.execute(insert(post_search).values(rowid=doc_id, title=title, body=plain_text(body or "")))
+
+
+async def index_posts(db: AsyncSession, posts: list[tuple]) -> None:
+    """Index newly inserted ``(id, title, body)`` posts with one executemany per table (bulk import)."""
+    if _is_postgresql(db) or not posts:
+        return
+    # The posts are already inserted in this transaction, so SQLite's write lock
+    # is held and no one else can take these doc ids in between.
+    first = (await db.scalar(select(func.max(post_search_docs.c.doc_id))) or 0) + 1
+    await db.execute(
+        insert(post_search_docs),
+        [{"doc_id": first + i, "post_id": post_id} for i, (post_id, _, _) in enumerate(posts)],
+    )
+    await db.execute(
+        insert(post_search),
+        [
+            {"rowid": first + i, "title": title, "body": plain_text(body or "")}
+            for i, (_, title, body) in enumerate(posts)
+        ],
+    )
+
+
+def _fts_query(q: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 query syntax.
+    return " ".join(f'"{token}"' for token in _TOKEN.findall(q))
+
+
+def _highlight(raw: str | None) -> str:
+    escaped = html.escape(raw or "")
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+async def _search_postgresql(db: AsyncSession, q: str, limit: int, cursor: str | None):
+    query = func.websearch_to_tsquery(TS_CONFIG, q)
+    score = func.ts_rank_cd(search_vector, query).cast(Float).label("score")
+    stmt = select(Post.id, score).where(Post.published_at.isnot(None), search_vector.op("@@")(query))
+    if cursor:
+        stmt = stmt.where(tuple_(score, Post.id) < decode_rank_cursor(cursor))
+    ranked = (await db.execute(stmt.order_by(score.desc(), Post.id.desc()).limit(limit))).all()
+    if not ranked:
+        return []
+    options = f"StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+    headlines = dict(
+        (
+            await db.execute(
+                select(Post.id, func.ts_headline(TS_CONFIG, Post.body, query, options)).where(
+                    Post.id.in_([post_id for post_id, _ in ranked])
+                )
+            )
+        ).all()
+    )
+    return [(post_id, score, headlines.get(post_id)) for post_id, score in ranked]
+
+
+async def _search_sqlite(db: AsyncSession, q: str, limit: int, cursor: str | None):
+    match = _fts_query(q)
+    if not match:
+        return []
+    matches = (
+        select(
+            post_search.c.rowid.label("doc_id"),
+            (-func.bm25(literal_column("post_search"), 10.0, 1.0)).label("score"),
+        )
+        .where(literal_column("post_search").op("MATCH")(bindparam("match", match)))
+        .subquery()
+    )
+    stmt = (
+        select(post_search_docs.c.post_id, matches.c.score)
+        .join(post_search_docs, post_search_docs.c.doc_id == matches.c.doc_id)
+        .join(Post, Post.id == post_search_docs.c.post_id)
+        .where(Post.published_at.isnot(None))
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(matches.c.score, post_search_docs.c.post_id) < decode_rank_cursor(cursor))
+    stmt = stmt.order_by(matches.c.score.desc(), post_search_docs.c.post_id.desc()).limit(limit)
+    ranked = (await db.execute(stmt)).all()
+    if not ranked:
+        return []
+    snippet = func.snippet(literal_column("post_search"), 1, _START, _STOP, "…", SNIPPET_WORDS)
+    snippets = dict(
+        (
+            await db.execute(
+                select(post_search_docs.c.post_id, snippet)
+                .select_from(post_search)
+                .join(post_search_docs, post_search_docs.c.doc_id == post_search.c.rowid)
+                .where(
+                    literal_column("post_search").op("MATCH")(match),
+                    post_search_docs.c.post_id.in_([post_id for post_id, _ in ranked]),
+                )
+            )
+        ).all()
+    )
+    return [(post_id, score, snippets.get(post_id)) for post_id, score in ranked]
+
+
+async def search_posts(
+    db: AsyncSession, q: str, limit: int, cursor: str | None = None
+) -> list[tuple[UUID, float, str]]:
+    """Return one page of (post_id, score, snippet) for published posts matching ``q``, best first."""
+    search = _search_postgresql if _is_postgresql(db) else _search_sqlite
+    return [(post_id, score, _highlight(raw)) for post_id, score, raw in await search(db, q, limit, cursor)]
+
+
+async def rebuild(db: AsyncSession, batch_size: int = 500) -> int:
+    """Reindex every post; returns the number of posts indexed."""
+    if _is_postgresql(db):
+        await db.execute(text("REINDEX INDEX ix_posts_search_vector"))
+        await db.commit()
+        return await db.scalar(select(func.count()).select_from(Post))
+    await db.execute(delete(post_search))
+    await db.execute(delete(post_search_docs))
+    indexed = 0
+    last_id = None
+    while True:
+        q = select(Post.id, Post.title, Post.body).order_by(Post.id).limit(batch_size)
+        if last_id is not None:
+            q = q.where(Post.id > last_id)
+        rows = (await db.execute(q)).all()
+        if not rows:
+            break
+        for post_id, title, body in rows:
+            await _add(db, post_id, title, body)
+        await db.commit()
+        indexed += len(rows)
+        last_id = rows[-1][0]
+    return indexed
@@ -1,23 +1,132 @@
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-
 from app.config import settings
+from app.core.cache import MemoryCacheBackend
+
+
+@functools.cache
+def pwd_context():
+    """Built on first use: passlib/bcrypt cost nothing until a password is hashed."""
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Pinning min/max to the configured cost makes needs_update() flag any hash
+    # made with a different cost, so it is transparently rehashed on next login.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+        bcrypt__max_rounds=settings.bcrypt_rounds,
+    )
+
+# Decoded payloads, kept until the token's own expiry.
+_token_cache = MemoryCacheBackend(max_entries=settings.token_cache_max_entries)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool, off the request threadpool.
+
+    At most ``max_concurrency`` hashes run at once; further callers wait on an
+    asyncio semaphore (holding no thread) and are counted in ``waiting``.
+    The pool is created by :meth:`start` (from the lifespan handler) and its
+    workers are spawned, not forked: forking a running server copies its event
+    loop, threads and open database connections. ``workers=0``, or a hasher
+    that was never started, hashes in the default thread executor instead, for
+    tests and single-process dev setups.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    def start(self) -> None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        waited = started_at - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.run_seconds_total += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "run_seconds_total": round(self.run_seconds_total, 6),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_concurrency=settings.password_hash_max_concurrency,
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -28,8 +137,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> Optional[dict]:
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except JWTError:
         return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        _token_cache.set(token, payload, ttl)
+    return payload
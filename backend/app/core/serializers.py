@@ -0,0 +1,95 @@
+"""Post responses built straight from column rows and rendered with orjson.
+
+List and detail reads select exactly the columns a response needs (post plus
+embedded author) instead of hydrating ``Post``/``User`` objects into the
+identity map, turn each row into a plain dict shaped like ``PostResponse`` /
+``PostSummary`` and return an :class:`ORJSONResponse`, which FastAPI sends
+as-is, with no second validation pass against ``response_model``. The dicts
+hold only trusted column values, and orjson renders UUIDs and datetimes in
+the same form pydantic does. ``fields="html"`` swaps the markdown body for
+the sanitized HTML stored on write (see ``app/core/render.py``).
+"""
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Select, select
+
+from app.core.render import html_for
+from app.models.post import Post
+from app.models.user import User
+
+AUTHOR_FIELDS = ("id", "username", "display_name", "avatar_url")
+POST_FIELDS = {
+    "full": (
+        "id", "author_id", "title", "slug", "body", "body_format", "cover_image_url",
+        "published_at", "created_at", "updated_at", "revision",
+    ),
+    "summary": (
+        "id", "author_id", "title", "slug", "excerpt", "word_count", "reading_time", "cover_image_url",
+        "published_at", "created_at", "updated_at",
+    ),
+}
+# "html" responses have the "full" shape with ``body`` replaced by the sanitized render.
+POST_FIELDS["html"] = POST_FIELDS["full"] + ("body_html", "body_html_hash")
+_AUTHOR_PREFIX = "author__"
+USER_FIELDS = (
+    "id", "email", "username", "display_name", "bio", "avatar_url",
+    "follower_count", "following_count", "post_count", "created_at",
+)
+
+
+def post_rows(fields: str = "full") -> Select:
+    """SELECT of the response columns for ``fields``, posts joined to their authors.
+
+    Rows expose the post columns by name (``row.id``, ``row.published_at``), so
+    they page and merge like ``Post`` objects. Extra columns added with
+    ``add_columns`` come after the serialized ones and are ignored by
+    :func:`post_dict`.
+    """
+    return select(
+        *(getattr(Post, f) for f in POST_FIELDS[fields]),
+        *(getattr(User, f).label(_AUTHOR_PREFIX + f) for f in AUTHOR_FIELDS),
+    ).join(User, User.id == Post.author_id)
+
+
+def _build(values, fields: str) -> dict[str, Any]:
+    names = POST_FIELDS[fields]
+    data = dict(zip(names, values))
+    data["author"] = dict(zip(AUTHOR_FIELDS, values[len(names):len(names) + len(AUTHOR_FIELDS)]))
+    if fields == "html":
+        stored, stored_hash = data.pop("body_html"), data.pop("body_html_hash")
+        data["body"] = html_for(data["body"], data["body_format"], stored, stored_hash)
+        data["body_format"] = "html"
+    return data
+
+
+def post_dict(row, fields: str = "full") -> dict[str, Any]:
+    return _build(tuple(row), fields)
+
+
+def post_dict_from_orm(post: Post, fields: str = "full") -> dict[str, Any]:
+    """Same shape as :func:`post_dict` for a loaded ``Post`` (with ``author``), e.g. after a write."""
+    values = tuple(getattr(post, f) for f in POST_FIELDS[fields])
+    return _build(values + tuple(getattr(post.author, f) for f in AUTHOR_FIELDS), fields)
+
+
+def post_dicts(rows: Iterable, fields: str = "full") -> list[dict[str, Any]]:
+    return [_build(tuple(row), fields) for row in rows]
+
+
+def user_rows() -> Select:
+    """SELECT of the ``UserResponse`` columns."""
+    return select(*(getattr(User, f) for f in USER_FIELDS))
+
+
+def user_dict(row) -> dict[str, Any]:
+    return dict(zip(USER_FIELDS, row))
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+def json_response(content: Any, headers: dict[str, str] | None = None) -> ORJSONResponse:
+    return ORJSONResponse(content, headers=headers)
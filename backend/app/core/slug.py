@@ -1,9 +1,121 @@
 import re
+import secrets
 import uuid
 
+from sqlalchemy import BigInteger, and_, case, cast, func, literal, or_, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.post import Post
+
+# Keeps the UNION ALL of per-base aggregates well under SQLite's compound SELECT limit (500).
+SLUG_BASES_PER_QUERY = 50
+
 
 def slugify(text: str) -> str:
     text = text.lower().strip()
     text = re.sub(r"[^\w\s-]", "", text)
     text = re.sub(r"[-\s]+", "-", text)
     return text.strip("-") or str(uuid.uuid4())[:8]
+
+
+def _random_slug(base_slug: str) -> str:
+    return f"{base_slug}-{secrets.token_hex(3)}"
+
+
+def _slug_stats(dialect_name: str, base_slug: str):
+    """One row: whether ``base_slug`` is taken, its numbered copies (``base-N``) and their highest N.
+
+    Only numeric suffixes match, and SQL aggregates them, so the cost doesn't
+    grow with how many other slugs merely start with ``base-``.
+    """
+    prefix = base_slug + "-"
+    suffix = func.substr(Post.slug, len(prefix) + 1)
+    # Digits sort between "0" and ":", so the index range only covers slugs like "base-12..."; the
+    # last condition drops the ones with anything but digits after the dash ("base-2nd-try").
+    if dialect_name == "postgresql":
+        # text_pattern_ops comparisons, served by ix_posts_slug_pattern under any collation.
+        copy = and_(
+            Post.slug.op("~>=~", is_comparison=True)(prefix + "0"),
+            Post.slug.op("~<~", is_comparison=True)(prefix + ":"),
+            suffix.regexp_match("^[0-9]{1,18}$"),
+        )
+    else:
+        # Binary collation, so ix_posts_slug serves the range.
+        copy = and_(
+            Post.slug >= prefix + "0",
+            Post.slug < prefix + ":",
+            ~suffix.op("GLOB", is_comparison=True)("*[^0-9]*"),
+        )
+    return select(
+        literal(base_slug).label("base"),
+        func.count(case((Post.slug == base_slug, 1))).label("taken"),
+        func.count(case((copy, 1))).label("copies"),
+        func.max(case((copy, cast(suffix, BigInteger)))).label("highest"),
+    ).where(or_(Post.slug == base_slug, copy))
+
+
+async def next_free_slug(db: AsyncSession, base_slug: str) -> str:
+    """The first free slug among ``base``, ``base-1``, ``base-2``... in one indexed query.
+
+    Numbered copies continue from the highest suffix in use. A base with at
+    least ``slug_max_numeric_suffix`` numbered copies gets a short random
+    suffix instead.
+    """
+    stats = (await db.execute(_slug_stats(db.bind.dialect.name, base_slug))).one()
+    return _first_free(base_slug, stats.taken, stats.copies, stats.highest)
+
+
+def _first_free(base_slug: str, taken: int, copies: int, highest: int | None) -> str:
+    if not taken:
+        return base_slug
+    if copies >= settings.slug_max_numeric_suffix:
+        return _random_slug(base_slug)
+    return f"{base_slug}-{(highest or 0) + 1}"
+
+
+async def allocate_slugs(db: AsyncSession, base_slugs: list[str]) -> list[str]:
+    """Free slugs for a batch of new posts, distinct from each other too (bulk import).
+
+    Like :func:`next_free_slug`, with one query per ``SLUG_BASES_PER_QUERY``
+    distinct bases instead of one per post. The caller retries on a unique
+    violation, since nothing is reserved.
+    """
+    dialect = db.bind.dialect.name
+    bases = sorted(set(base_slugs))
+    stats = {}
+    for i in range(0, len(bases), SLUG_BASES_PER_QUERY):
+        chunk = bases[i:i + SLUG_BASES_PER_QUERY]
+        rows = await db.execute(union_all(*(_slug_stats(dialect, b) for b in chunk)))
+        stats.update({row.base: (row.taken, row.copies, row.highest) for row in rows})
+    slugs = []
+    for base_slug in base_slugs:
+        taken, copies, highest = stats[base_slug]
+        slugs.append(_first_free(base_slug, taken, copies, highest))
+        # Count what this batch takes, following the branches of _first_free.
+        if not taken:
+            stats[base_slug] = (1, copies, highest)
+        elif copies < settings.slug_max_numeric_suffix:
+            stats[base_slug] = (taken, copies + 1, (highest or 0) + 1)
+    return slugs
+
+
+async def add_with_unique_slug(db: AsyncSession, post: Post, base_slug: str) -> None:
+    """Add and flush ``post`` with a free slug, retrying if a concurrent insert takes it.
+
+    Each attempt runs in a SAVEPOINT so a unique violation only undoes the
+    insert. Retries use random suffixes, since a racing creator is likely to
+    be probing the same numeric one.
+    """
+    post.slug = await next_free_slug(db, base_slug)
+    for _ in range(settings.slug_insert_attempts):
+        try:
+            async with db.begin_nested():
+                db.add(post)
+            return
+        except IntegrityError as exc:
+            if "slug" not in str(exc.orig):
+                raise
+            post.slug = _random_slug(base_slug)
+    raise RuntimeError(f"Could not allocate a unique slug for {base_slug!r}")
@@ -0,0 +1,49 @@
+"""Excerpt, word count and reading time, computed when a post body is written."""
+import math
+import re
+
+from app.models.post import Post
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 238
+
+_CODE_FENCE = re.compile(r"```.*?```", re.S)
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_MARKUP = re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+|[*_`~]", re.M)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def plain_text(body: str) -> str:
+    text = _CODE_FENCE.sub(" ", body)
+    text = _IMAGE.sub(" ", text)
+    text = _LINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _MARKUP.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:!?") + "…"
+
+
+def summarize(body: str) -> dict:
+    """The summary column values for ``body``."""
+    text = plain_text(body)
+    word_count = len(text.split())
+    return {
+        "excerpt": make_excerpt(text),
+        "word_count": word_count,
+        "reading_time": max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+def apply_summary(post: Post) -> None:
+    """Refresh the precomputed summary columns from ``post.body``."""
+    for name, value in summarize(post.body or "").items():
+        setattr(post, name, value)
+
@@ -0,0 +1,172 @@
+"""Materialized home timelines (fan-out-on-write).
+
+Publishing a post copies a row into ``timeline_entries`` for each follower of
+its author, so a logged-in feed is a single index range scan on
+``(user_id, published_at, post_id)`` instead of an ``IN`` over every followed
+author. Authors with more than ``timeline_fanout_max_followers`` followers are
+recorded in ``fanout_on_read_authors`` and their posts are merged in at read
+time instead.
+"""
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import GUID
+from app.core.pagination import paginate_posts
+from app.core.serializers import post_rows
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.timeline import FanoutOnReadAuthor, TimelineEntry
+from app.models.user import User
+
+_COLUMNS = ["user_id", "post_id", "author_id", "published_at"]
+
+
+async def _is_fanout_on_read(db: AsyncSession, author_id) -> bool:
+    return await db.get(FanoutOnReadAuthor, author_id) is not None
+
+
+async def _follower_count(db: AsyncSession, author_id) -> int:
+    return await db.scalar(select(User.follower_count).where(User.id == author_id))
+
+
+async def _fans_out(db: AsyncSession, author_id) -> bool:
+    """Whether the author's posts are pushed to followers; records them as fan-out-on-read when too popular."""
+    if await _is_fanout_on_read(db, author_id):
+        return False
+    if await _follower_count(db, author_id) > settings.timeline_fanout_max_followers:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(FanoutOnReadAuthor).values(author_id=author_id))
+        except IntegrityError:
+            pass  # a concurrent publish by the same author recorded it first
+        return False
+    return True
+
+
+async def publish_post(db: AsyncSession, post: Post) -> None:
+    """Fan a (re)published post out to its author's followers."""
+    await remove_post(db, post.id)
+    if not await _fans_out(db, post.author_id):
+        return
+    followers = select(
+        Follow.follower_id,
+        literal(post.id, GUID()),
+        literal(post.author_id, GUID()),
+        literal(post.published_at),
+    ).where(Follow.following_id == post.author_id)
+    await db.execute(insert(TimelineEntry).from_select(_COLUMNS, followers))
+
+
+async def publish_posts(db: AsyncSession, author_id, post_ids: list) -> None:
+    """Fan newly inserted published posts out to the author's followers in one statement (bulk import)."""
+    if not post_ids or not await _fans_out(db, author_id):
+        return
+    followers = (
+        select(Follow.follower_id, Post.id, Post.author_id, Post.published_at)
+        .join(Post, Post.author_id == Follow.following_id)
+        .where(Follow.following_id == author_id, Post.id.in_(post_ids), Post.published_at.isnot(None))
+    )
+    await db.execute(insert(TimelineEntry).from_select(_COLUMNS, followers))
+
+
+async def remove_post(db: AsyncSession, post_id) -> None:
+    """Drop an unpublished or deleted post from every timeline."""
+    await db.execute(delete(TimelineEntry).where(TimelineEntry.post_id == post_id))
+
+
+async def follow(db: AsyncSession, follower_id, author_id) -> None:
+    """Seed a new follower's timeline with the author's most recent posts."""
+    if await _is_fanout_on_read(db, author_id):
+        return
+    recent = (
+        select(
+            literal(follower_id, GUID()),
+            Post.id,
+            Post.author_id,
+            Post.published_at,
+        )
+        .where(Post.author_id == author_id, Post.published_at.isnot(None))
+        .order_by(Post.published_at.desc(), Post.id.desc())
+        .limit(settings.timeline_follow_backfill)
+    )
+    await db.execute(insert(TimelineEntry).from_select(_COLUMNS, recent))
+
+
+async def unfollow(db: AsyncSession, follower_id, author_id) -> None:
+    await db.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.user_id == follower_id,
+            TimelineEntry.author_id == author_id,
+        )
+    )
+
+
+async def timeline_posts(
+    db: AsyncSession,
+    user_id,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    fields: str = "full",
+) -> list:
+    """Return one page of a user's home timeline, newest first, as :func:`post_rows` rows."""
+    window = limit if cursor else offset + limit
+    pushed = (
+        await db.execute(
+            paginate_posts(
+                post_rows(fields)
+                .join(TimelineEntry, TimelineEntry.post_id == Post.id)
+                .where(TimelineEntry.user_id == user_id),
+                window,
+                cursor=cursor,
+                keys=(TimelineEntry.published_at, TimelineEntry.post_id),
+            )
+        )
+    ).all()
+    pulled_authors = (
+        select(FanoutOnReadAuthor.author_id)
+        .join(Follow, Follow.following_id == FanoutOnReadAuthor.author_id)
+        .where(Follow.follower_id == user_id)
+    )
+    pulled = (
+        await db.execute(
+            paginate_posts(
+                post_rows(fields)
+                .where(Post.published_at.isnot(None), Post.author_id.in_(pulled_authors)),
+                window,
+                cursor=cursor,
+            )
+        )
+    ).all()
+    posts = pushed
+    if pulled:
+        merged = {p.id: p for p in posts + pulled}.values()
+        posts = sorted(merged, key=lambda p: (p.published_at, str(p.id)), reverse=True)
+    start = 0 if cursor else offset
+    return posts[start:start + limit]
+
+
+async def backfill(db: AsyncSession) -> int:
+    """Rebuild every timeline from the follow graph; returns the number of entries written."""
+    await db.execute(delete(TimelineEntry))
+    await db.execute(delete(FanoutOnReadAuthor))
+    await db.commit()
+    authors = (
+        await db.execute(select(Follow.following_id, func.count()).group_by(Follow.following_id))
+    ).all()
+    written = 0
+    for author_id, followers in authors:
+        if followers > settings.timeline_fanout_max_followers:
+            db.add(FanoutOnReadAuthor(author_id=author_id))
+        else:
+            rows = (
+                select(Follow.follower_id, Post.id, Post.author_id, Post.published_at)
+                .join(Post, Post.author_id == Follow.following_id)
+                .where(Follow.following_id == author_id, Post.published_at.isnot(None))
+            )
+            result = await db.execute(insert(TimelineEntry).from_select(_COLUMNS, rows))
+            written += result.rowcount
+        await db.commit()
+    return written
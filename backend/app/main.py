@@ -1,27 +1,87 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.core.database import engine, Base
-from app.api import auth, users, posts, feed
+from app.core import popular
+from app.core.database import dispose_engine, get_engine
+from app.core.metrics import MetricsMiddleware
+from app.core.querywatch import QueryWatchMiddleware
+from app.core.replication import LAST_WRITE_HEADER, LastWriteMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_hasher
+from app.core.views import view_counter
+from app.api import auth, users, posts, feed, stats, metrics
+
+logger = logging.getLogger(__name__)
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def migrate() -> None:
+    """``alembic upgrade head`` (blocking; alembic's env.py runs its own event loop)."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(ALEMBIC_INI)), "head")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.auto_migrate:
+        await asyncio.to_thread(migrate)
+    get_engine()
+    password_hasher.start()
+    background = []
+    if settings.view_tracking_enabled:
+        background = [asyncio.create_task(view_counter.run()), asyncio.create_task(popular.run())]
+    logger.info("ready %.0f ms after import", (time.perf_counter() - _import_started) * 1000)
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if settings.view_tracking_enabled:
+        try:
+            await view_counter.flush()
+        except Exception:
+            logger.exception("final view flush failed; the counts stay spilled")
+    password_hasher.shutdown()
+    await dispose_engine()
+
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; no database connection or schema work happens here."""
+    app = FastAPI(title=settings.project_name, lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3001"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER, "X-Cache", "X-DB-Queries", "Server-Timing"],
+    )
+    if settings.read_database_url:
+        app.add_middleware(LastWriteMiddleware)
+    if settings.query_watch != "off":
+        app.add_middleware(QueryWatchMiddleware)
+    # Added last, so it wraps everything else and times the whole request.
+    app.add_middleware(MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
+    for module in (auth, users, posts, feed, stats):
+        app.include_router(module.router, prefix=settings.api_v1_prefix)
+    app.include_router(metrics.router)
 
-app = FastAPI(title=settings.project_name)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3001"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    @app.get("/")
+    async def root():
+        return {"message": "Folio Blog API", "docs": "/docs"}
 
-app.include_router(auth.router, prefix=settings.api_v1_prefix)
-app.include_router(users.router, prefix=settings.api_v1_prefix)
-app.include_router(posts.router, prefix=settings.api_v1_prefix)
-app.include_router(feed.router, prefix=settings.api_v1_prefix)
+    return app
 
 
-@app.get("/")
-def root():
-    return {"message": "Folio Blog API", "docs": "/docs"}
+app = create_app()
@@ -1,5 +1,8 @@
 from app.models.user import User
 from app.models.post import Post
 from app.models.follow import Follow
+from app.models.timeline import FanoutOnReadAuthor, TimelineEntry
+from app.models.popular import PopularPost
+from app.models.revision import PostRevision
 
-__all__ = ["User", "Post", "Follow"]
+__all__ = ["User", "Post", "Follow", "TimelineEntry", "FanoutOnReadAuthor", "PopularPost", "PostRevision"]
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base, GUID
@@ -8,7 +8,12 @@ from app.core.database import Base, GUID
 
 class Follow(Base):
     __tablename__ = "follows"
-    __table_args__ = (UniqueConstraint("follower_id", "following_id", name="uq_follow"),)
+    __table_args__ = (
+        UniqueConstraint("follower_id", "following_id", name="uq_follow"),
+        # "Who follows X" / "whom does X follow", newest first (keyset on created_at, other id)
+        Index("ix_follows_following_created_at", "following_id", "created_at", "follower_id"),
+        Index("ix_follows_follower_created_at", "follower_id", "created_at", "following_id"),
+    )
 
     follower_id = Column(GUID(), ForeignKey("users.id"), primary_key=True)
     following_id = Column(GUID(), ForeignKey("users.id"), primary_key=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+
+from app.core.database import Base, GUID
+
+
+class PopularPost(Base):
+    """A post's place in the precomputed popular feed (see ``app/core/popular.py``)."""
+
+    __tablename__ = "popular_posts"
+
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    post_id = Column(GUID(), ForeignKey("posts.id"), nullable=False, unique=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base, GUID
@@ -9,6 +9,13 @@ from app.core.database import Base, GUID
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_published_at_id", "published_at", "id"),
+        Index("ix_posts_author_published_at_id", "author_id", "published_at", "id"),
+        Index("ix_posts_slug_pattern", "slug", postgresql_ops={"slug": "text_pattern_ops"}).ddl_if(
+            dialect="postgresql"
+        ),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     author_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
@@ -17,6 +24,16 @@ class Post(Base):
     body = Column(Text, nullable=False)
     body_format = Column(String(20), default="markdown")
     cover_image_url = Column(String(500), nullable=True)
+    excerpt = Column(String(500), nullable=True)
+    word_count = Column(Integer, nullable=True)
+    reading_time = Column(Integer, nullable=True)
+    body_html = Column(Text, nullable=True)
+    body_html_hash = Column(String(32), nullable=True)
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Body revision, bumped by autosaves and body edits; revised_at is when it was
+    # written (NULL means updated_at, for posts not edited since revisions existed).
+    revision = Column(Integer, nullable=False, default=1, server_default="1")
+    revised_at = Column(DateTime, nullable=True)
     published_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
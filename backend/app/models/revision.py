@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+
+from app.core.database import Base, GUID
+
+
+class PostRevision(Base):
+    """An earlier revision of a post body: a full ``body`` or a ``delta`` back from the next revision."""
+
+    __tablename__ = "post_revisions"
+
+    post_id = Column(GUID(), ForeignKey("posts.id"), primary_key=True)
+    revision = Column(Integer, primary_key=True, autoincrement=False)
+    body = Column(Text, nullable=True)
+    delta = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+
+from app.core.database import Base, GUID
+
+
+class TimelineEntry(Base):
+    """A published post materialized into a follower's home timeline."""
+
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        Index("ix_timeline_user_published_at_post", "user_id", "published_at", "post_id"),
+        Index("ix_timeline_post", "post_id"),
+    )
+
+    user_id = Column(GUID(), ForeignKey("users.id"), primary_key=True)
+    post_id = Column(GUID(), ForeignKey("posts.id"), primary_key=True)
+    author_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
+    published_at = Column(DateTime, nullable=False)
+
+
+class FanoutOnReadAuthor(Base):
+    """Authors with too many followers to fan out; their posts are merged in at read time."""
+
+    __tablename__ = "fanout_on_read_authors"
+
+    author_id = Column(GUID(), ForeignKey("users.id"), primary_key=True)
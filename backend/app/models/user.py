@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base, GUID
@@ -17,6 +17,12 @@ class User(Base):
     display_name = Column(String(200), nullable=True)
     bio = Column(String(500), nullable=True)
     avatar_url = Column(String(500), nullable=True)
+    # Maintained by app/core/counters.py
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Moved with the counters instead of updated_at; NULL until they first change.
+    counts_changed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -31,3 +37,7 @@ class User(Base):
         back_populates="following",
         foreign_keys="Follow.following_id",
     )
+
+
+# Serves the case-insensitive lookups in app/api/auth.py (lower(email) = ?).
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
@@ -0,0 +1,19 @@
+"""Query-budget fixture for tests: enable with ``pytest -p app.pytest_plugin``
+or ``pytest_plugins = ["app.pytest_plugin"]`` in a conftest::
+
+    def test_feed_is_two_queries(client, query_budget):
+        with query_budget(max_queries=3):
+            client.get("/api/v1/feed")
+
+The block fails with :class:`~app.core.querywatch.QueryIssuesFound` (an
+``AssertionError``) when it runs more statements than the budget or shows an
+N+1 pattern; the yielded watch holds the recorded statements.
+"""
+import pytest
+
+from app.core.querywatch import watch_queries
+
+
+@pytest.fixture
+def query_budget():
+    return watch_queries
@@ -1,14 +1,19 @@
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
-from app.schemas.post import PostCreate, PostUpdate, PostResponse
+from app.schemas.user import FollowUser, UserBatch, UserCreate, UserUpdate, UserResponse
+from app.schemas.post import PostBatch, PostCreate, PostUpdate, PostResponse, PostSearchResult, PostSummary
 from app.schemas.auth import Token, TokenPayload
 
 __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserBatch",
+    "FollowUser",
     "PostCreate",
     "PostUpdate",
     "PostResponse",
+    "PostSummary",
+    "PostSearchResult",
+    "PostBatch",
     "Token",
     "TokenPayload",
 ]
@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, StrictInt, StrictStr
 
 from app.schemas.user import UserResponse
 
@@ -17,12 +18,48 @@ class PostCreate(PostBase):
     published: bool = False
 
 
+class PostImport(PostBase):
+    """One post to import; ``published_at`` keeps its original date, ``published=False`` makes a draft."""
+    slug: str | None = None
+    published: bool | None = None
+    published_at: datetime | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
 class PostUpdate(BaseModel):
     title: str | None = None
     body: str | None = None
     body_format: str | None = None
     cover_image_url: str | None = None
     published: bool | None = None
+    # When set, the update is refused (409) unless the post is still at this revision.
+    base_revision: int | None = None
+
+
+class PostBodyPatch(BaseModel):
+    """An autosave: ot.js-style ops (retain n, delete -n, insert "text"; UTF-16 units) against ``base_revision``."""
+    base_revision: int
+    ops: list[StrictInt | StrictStr] = Field(max_length=10000)
+
+
+class PostRevisionSaved(BaseModel):
+    id: UUID
+    revision: int
+    revised_at: datetime
+
+
+class PostRevisionInfo(BaseModel):
+    """A history entry; ``snapshot`` revisions are stored whole, the rest as deltas."""
+    revision: int
+    created_at: datetime
+    snapshot: bool
+
+
+class PostRevisionBody(BaseModel):
+    revision: int
+    created_at: datetime
+    body: str
 
 
 class PostAuthor(BaseModel):
@@ -47,6 +84,43 @@ class PostResponse(BaseModel):
     published_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
+    revision: int = 1
+
+    class Config:
+        from_attributes = True
+
+
+PostFields = Literal["full", "summary", "html"]
+# "html": ``body`` is the sanitized, pre-rendered HTML and ``body_format`` is "html".
+PostDetailFields = Literal["full", "html"]
+
+
+class PostSummary(BaseModel):
+    """List item without the body; excerpt and reading time are precomputed on write."""
+    id: UUID
+    author_id: UUID
+    author: PostAuthor | None = None
+    title: str
+    slug: str
+    excerpt: str | None = None
+    word_count: int | None = None
+    reading_time: int | None = None
+    cover_image_url: str | None = None
+    published_at: datetime | None = None
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class PostSearchResult(PostSummary):
+    """A search hit: the post summary plus its relevance and an HTML snippet with ``<mark>``-ed matches."""
+    score: float = 0.0
+    snippet: str = ""
+
+
+class PostBatch(BaseModel):
+    """Posts in request order; ``missing`` echoes ids that don't exist or aren't visible to the caller."""
+    items: list[PostResponse] | list[PostSummary]
+    missing: list[str]
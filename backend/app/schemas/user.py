@@ -30,7 +30,25 @@ class UserResponse(BaseModel):
     display_name: str | None = None
     bio: str | None = None
     avatar_url: str | None = None
+    follower_count: int = 0
+    following_count: int = 0
+    post_count: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class FollowUser(BaseModel):
+    """An entry in a followers/following list."""
+    id: UUID
+    username: str
+    display_name: str | None = None
+    avatar_url: str | None = None
+    followed_at: datetime
+
+
+class UserBatch(BaseModel):
+    """Users in request order; ``missing`` echoes the ids/usernames that matched no one."""
+    items: list[UserResponse]
+    missing: list[str]
@@ -0,0 +1,132 @@
+"""Throughput of the async request path vs. the previous sync/threadpool path.
+
+Seeds a SQLite file, then drives ``GET /posts`` through the real (async) app
+and through an equivalent sync endpoint (sync ``Session`` in FastAPI's
+threadpool, as before the async migration) with the same concurrency::
+
+    python -m benchmarks.async_vs_sync --posts 5000 --requests 2000 --concurrency 64
+
+Prints one JSON object with requests/s and latency percentiles for each path.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def seed(url: str, users: int, posts: int) -> None:
+    from sqlalchemy import create_engine, insert
+
+    from app.core.database import Base
+    from app.models import Post, User
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": uid, "email": f"user{i}@example.com", "hashed_password": "x", "username": f"user{i}"}
+            for i, uid in enumerate(user_ids)
+        ])
+        conn.execute(insert(Post), [
+            {
+                "author_id": user_ids[i % users],
+                "title": f"Post {i}",
+                "slug": f"post-{i}",
+                "body": "lorem ipsum " * 200,
+                "published_at": now - timedelta(minutes=i),
+            }
+            for i in range(posts)
+        ])
+    engine.dispose()
+
+
+def sync_app(url: str):
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+    from app.models import Post
+    from app.schemas.post import PostResponse
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/api/v1/posts", response_model=list[PostResponse])
+    def list_posts(limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+        q = db.query(Post).options(joinedload(Post.author)).filter(Post.published_at.isnot(None))
+        posts = q.order_by(Post.published_at.desc()).offset(offset).limit(limit).all()
+        return [PostResponse.model_validate(p) for p in posts]
+
+    return app
+
+
+async def drive(app, requests: int, concurrency: int, pages: int) -> dict:
+    import httpx
+
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with sem:
+                start = time.perf_counter()
+                r = await client.get("/api/v1/posts", params={"limit": 20, "offset": (i % pages) * 20})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(q[49] * 1000, 2),
+        "p95_ms": round(q[94] * 1000, 2),
+        "p99_ms": round(q[98] * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.async_vs_sync")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    seed(url, args.users, args.posts)
+
+    from app.main import app as async_app
+
+    pages = max(1, args.posts // 20)
+    result = {
+        "dataset": {"users": args.users, "posts": args.posts, "concurrency": args.concurrency},
+        "sync_threadpool": asyncio.run(drive(sync_app(url), args.requests, args.concurrency, pages)),
+        "async": asyncio.run(drive(async_app, args.requests, args.concurrency, pages)),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Diff two ``benchmarks.load`` result files::
+
+    python -m benchmarks.compare before.json after.json
+
+Prints one JSON object per scenario present in both runs with each metric's
+before/after values and the after/before ratio (below 1 is faster for
+latencies and queries, above 1 is better for throughput).
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "requests_per_second", "queries_per_request", "errors")
+
+
+def compare(before: dict, after: dict) -> dict:
+    diff = {}
+    for name, old in before["scenarios"].items():
+        new = after["scenarios"].get(name)
+        if new is None:
+            continue
+        diff[name] = {
+            metric: {
+                "before": old[metric],
+                "after": new[metric],
+                "ratio": round(new[metric] / old[metric], 3) if old[metric] else None,
+            }
+            for metric in METRICS
+        }
+    return diff
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as f, open(args.after) as g:
+        before, after = json.load(f), json.load(g)
+    print(json.dumps({
+        "revisions": [before.get("revision"), after.get("revision")],
+        "scenarios": compare(before, after),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Scenario load runner against the app in-process, for comparing runs.
+
+Point ``DATABASE_URL`` at a database built by ``benchmarks.seed`` and run any
+of the scenarios through the real app (lifespan included) over
+``httpx.ASGITransport``::
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.load --requests 2000 --concurrency 32 \\
+        --output before.json
+
+Scenarios:
+
+- ``anonymous_feed``: first page of ``GET /feed`` without a token.
+- ``followed_feed``: ``GET /feed`` as random users who follow someone.
+- ``deep_pagination``: ``GET /posts`` at random cursors 100-200 pages deep.
+- ``deep_offset``: the same depth with ``offset``.
+- ``post_by_slug``: ``GET /posts/slug/{slug}`` for random published posts.
+- ``login_burst``: ``POST /auth/login`` as random users (bcrypt-bound).
+- ``publish_burst``: ``POST /posts`` as random users (writes; reseed between
+  runs you want to compare).
+
+The response cache is off unless ``--response-cache`` is given, so list
+scenarios measure the database path rather than cache hits.
+
+Prints (and with ``--output`` writes) one JSON object with p50/p95/p99 and
+mean latency, throughput, status codes and SQL statements per request for each
+scenario. ``python -m benchmarks.compare before.json after.json`` diffs two runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+
+API = "/api/v1"
+SCENARIOS = {}
+
+
+def scenario(fn):
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+class QueryCounter:
+    """Counts every statement the engine executes (all requests together)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def percentile(quantiles: list[float], p: int) -> float:
+    return round(quantiles[p - 1] * 1000, 2)
+
+
+async def load_sample(size: int, rng: random.Random) -> dict:
+    """Random users, followers and published slugs to drive the scenarios."""
+    from sqlalchemy import func, select
+
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Follow, Post, User
+
+    async with SessionLocal() as db:
+        users = (await db.execute(select(User.id, User.email).order_by(func.random()).limit(size))).all()
+        followers = (
+            await db.scalars(select(User.id).where(User.following_count > 0).order_by(func.random()).limit(size))
+        ).all()
+        slugs = (
+            await db.scalars(
+                select(Post.slug).where(Post.published_at.isnot(None)).order_by(func.random()).limit(size)
+            )
+        ).all()
+        dataset = {
+            "users": await db.scalar(select(func.count()).select_from(User)),
+            "posts": await db.scalar(select(func.count()).select_from(Post)),
+            "follows": await db.scalar(select(func.count()).select_from(Follow)),
+        }
+    token = lambda user_id: {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    return {
+        "dataset": dataset,
+        "emails": [email for _, email in users],
+        "writers": [token(user_id) for user_id, _ in users],
+        "followers": [token(user_id) for user_id in followers],
+        "slugs": list(slugs),
+        "rng": rng,
+    }
+
+
+@scenario
+async def anonymous_feed(client, sample):
+    return lambda i: client.get(f"{API}/feed", params={"limit": 20})
+
+
+@scenario
+async def followed_feed(client, sample):
+    rng = sample["rng"]
+    return lambda i: client.get(f"{API}/feed", params={"limit": 20}, headers=rng.choice(sample["followers"]))
+
+
+@scenario
+async def deep_pagination(client, sample, first: int = 100, depth: int = 200):
+    cursors, cursor = [], None
+    for page in range(depth):
+        params = {"limit": 20, "fields": "summary", **({"cursor": cursor} if cursor else {})}
+        cursor = (await client.get(f"{API}/posts", params=params)).headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        if page >= first:
+            cursors.append(cursor)
+    rng = sample["rng"]
+    return lambda i: client.get(
+        f"{API}/posts", params={"limit": 20, "fields": "summary", "cursor": rng.choice(cursors or [""])}
+    )
+
+
+@scenario
+async def deep_offset(client, sample, first: int = 100, depth: int = 200):
+    rng = sample["rng"]
+    return lambda i: client.get(
+        f"{API}/posts", params={"limit": 20, "fields": "summary", "offset": rng.randrange(first, depth) * 20}
+    )
+
+
+@scenario
+async def post_by_slug(client, sample):
+    rng = sample["rng"]
+    return lambda i: client.get(f"{API}/posts/slug/{rng.choice(sample['slugs'])}")
+
+
+@scenario
+async def login_burst(client, sample):
+    from benchmarks.seed import PASSWORD
+
+    rng = sample["rng"]
+    return lambda i: client.post(
+        f"{API}/auth/login", json={"email": rng.choice(sample["emails"]), "password": PASSWORD}
+    )
+
+
+@scenario
+async def publish_burst(client, sample):
+    from benchmarks.seed import body
+
+    rng = sample["rng"]
+
+    def request(i):
+        post = {"title": f"Load test post {i}", "body": body(rng, 150), "published": True}
+        return client.post(f"{API}/posts", json=post, headers=rng.choice(sample["writers"]))
+
+    return request
+
+
+async def run(client, request, requests: int, concurrency: int, counter: QueryCounter) -> dict:
+    latencies = []
+    statuses = Counter()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            start = time.perf_counter()
+            response = await request(i)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": requests,
+        "errors": sum(n for status, n in statuses.items() if status >= 400),
+        "status_codes": {str(status): n for status, n in sorted(statuses.items())},
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": percentile(q, 50),
+        "p95_ms": percentile(q, 95),
+        "p99_ms": percentile(q, 99),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "queries_per_request": round((counter.count - queries_before) / requests, 2),
+    }
+
+
+async def run_all(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+
+    from app.core.database import get_engine
+    from app.main import create_app
+
+    app = create_app()
+    counter = QueryCounter()
+    results = {}
+    async with app.router.lifespan_context(app):
+        engine = get_engine()
+        event.listen(engine.sync_engine, "before_cursor_execute", counter)
+        sample = await load_sample(args.sample, random.Random(args.seed))
+        # Unhandled exceptions become 500s and count as errors instead of aborting the run.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in args.scenarios:
+                request = await SCENARIOS[name](client, sample)
+                if args.warmup:
+                    await run(client, request, args.warmup, args.concurrency, counter)
+                requests = args.login_requests if name == "login_burst" else args.requests
+                results[name] = await run(client, request, requests, args.concurrency, counter)
+        database = engine.dialect.name
+    return {"dataset": {"database": database, **sample["dataset"]}, "scenarios": results}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help=f"default: all of {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--login-requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--sample", type=int, default=1000, help="users/slugs sampled to drive requests")
+    parser.add_argument(
+        "--response-cache", action=argparse.BooleanOptionalAction, default=False,
+        help="serve anonymous lists from the response cache (off: measure the database path)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+    os.environ["RESPONSE_CACHE_ENABLED"] = str(args.response_cache).lower()
+    result = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        **asyncio.run(run_all(args)),
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
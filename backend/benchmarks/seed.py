@@ -0,0 +1,235 @@
+"""Synthetic, reproducible dataset for the load scenarios in benchmarks/load.py.
+
+Migrates an empty ``DATABASE_URL`` (SQLite or Postgres) to head and
+bulk-inserts users, posts and a power-law follow graph::
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --users 100000 --posts 1000000
+
+Who gets followed, and who writes, follows a Zipf distribution over users
+(``--follow-skew`` / ``--author-skew``), and each user's following count is
+Pareto-distributed around ``--mean-follows``, so a few authors end up with
+most followers (and above ``TIMELINE_FANOUT_MAX_FOLLOWERS``) while the median
+user has a handful. Counters, summaries and the search index are written the
+same way the app would; home timelines are built with the app's own backfill.
+Every user's password is ``PASSWORD``; the same ``--seed`` gives the same
+dataset. Prints one JSON object describing what was written.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+PASSWORD = "benchmark-password"
+WORDS = (
+    "the a of and to in is that it for on with as was at by be this from or have an they which one "
+    "you were all we when there can more if no out so said what up its about into than them only "
+    "other new some could time these two may then do first any now such like our over man me even "
+    "most made after also did many before must through back years where much your way well down "
+    "should because each just those people how too little state good very make world still own see "
+    "men work long get here between both life being under never day same another know while last "
+    "python database latency cache index query async request server worker design system network"
+).split()
+
+
+def zipf_weights(n: int, skew: float) -> list[float]:
+    """Cumulative weights for ``random.choices``: rank ``r`` is drawn with probability ~ 1/r**skew."""
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def following_count(rng: random.Random, mean: float, alpha: float, cap: int) -> int:
+    # Pareto with shape alpha > 1, scaled so the mean is ``mean``.
+    minimum = mean * (alpha - 1) / alpha
+    return min(cap, int(minimum * rng.paretovariate(alpha)))
+
+
+def body(rng: random.Random, words: int) -> str:
+    paragraphs = []
+    while words > 0:
+        n = min(words, rng.randint(30, 90))
+        text = " ".join(rng.choice(WORDS) for _ in range(n))
+        paragraphs.append(text[0].upper() + text[1:] + ".")
+        words -= n
+    return "\n\n".join(paragraphs)
+
+
+def batches(items, size: int):
+    it = iter(items)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def build_graph(args, rng: random.Random):
+    """User ids, each post's author index and the follow edges, all in memory (no text yet)."""
+    users = args.users
+    user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(users)]
+    # Popularity (who is followed) and productivity (who writes) are separate rankings.
+    followed_rank = list(range(users))
+    rng.shuffle(followed_rank)
+    author_rank = list(range(users))
+    rng.shuffle(author_rank)
+
+    follow_weights = zipf_weights(users, args.follow_skew)
+    follows = []
+    for follower in range(users):
+        want = following_count(rng, args.mean_follows, args.follow_alpha, users - 1)
+        targets = {followed_rank[r] for r in rng.choices(range(users), cum_weights=follow_weights, k=want)}
+        targets.discard(follower)
+        follows.extend((follower, target) for target in targets)
+
+    author_weights = zipf_weights(users, args.author_skew)
+    authors = [author_rank[r] for r in rng.choices(range(users), cum_weights=author_weights, k=args.posts)]
+    return user_ids, authors, follows
+
+
+def seed(args) -> dict:
+    from sqlalchemy import create_engine, insert
+
+    from app.core import search
+    from app.core.security import get_password_hash
+    from app.core.slug import slugify
+    from app.core.summary import apply_summary, plain_text
+    from app.main import migrate
+    from app.models import Follow, Post, User
+
+    migrate()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    user_ids, authors, follows = build_graph(args, rng)
+    followers = [0] * args.users
+    following = [0] * args.users
+    for follower, target in follows:
+        following[follower] += 1
+        followers[target] += 1
+    published = [rng.random() >= args.draft_ratio for _ in range(args.posts)]
+    post_counts = [0] * args.users
+    for author, is_published in zip(authors, published):
+        post_counts[author] += is_published
+
+    now = datetime.utcnow().replace(microsecond=0)
+    span = timedelta(days=args.days).total_seconds()
+    hashed = get_password_hash(PASSWORD)
+    engine = create_engine(args.database_url)
+    sqlite = engine.dialect.name == "sqlite"
+
+    with engine.begin() as conn:
+        for chunk in batches(range(args.users), args.batch_size):
+            conn.execute(insert(User), [
+                {
+                    "id": user_ids[i],
+                    "email": f"user{i}@example.com",
+                    "hashed_password": hashed,
+                    "username": f"user{i}",
+                    "display_name": f"User {i}",
+                    "follower_count": followers[i],
+                    "following_count": following[i],
+                    "post_count": post_counts[i],
+                    "created_at": now - timedelta(seconds=span),
+                    "updated_at": now - timedelta(seconds=span),
+                }
+                for i in chunk
+            ])
+
+    for chunk in batches(range(args.posts), args.batch_size):
+        rows, docs, texts = [], [], []
+        for i in chunk:
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9))).capitalize()
+            post = SimpleNamespace(body=body(rng, max(10, int(rng.lognormvariate(0, 0.6) * args.body_words))))
+            apply_summary(post)
+            created = now - timedelta(seconds=rng.random() * span)
+            rows.append({
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "author_id": user_ids[authors[i]],
+                "title": title,
+                "slug": f"{slugify(title)}-{i}",
+                "body": post.body,
+                "body_format": "markdown",
+                "excerpt": post.excerpt,
+                "word_count": post.word_count,
+                "reading_time": post.reading_time,
+                "published_at": created if published[i] else None,
+                "created_at": created,
+                "updated_at": created,
+            })
+            if sqlite and args.search:
+                docs.append({"doc_id": i + 1, "post_id": rows[-1]["id"]})
+                texts.append({"rowid": i + 1, "title": title, "body": plain_text(post.body)})
+        with engine.begin() as conn:
+            conn.execute(insert(Post), rows)
+            if docs:
+                conn.execute(insert(search.post_search_docs), docs)
+                conn.execute(insert(search.post_search), texts)
+
+    base = now - timedelta(seconds=span)
+    for chunk in batches(follows, args.batch_size * 4):
+        with engine.begin() as conn:
+            conn.execute(insert(Follow), [
+                {
+                    "follower_id": user_ids[follower],
+                    "following_id": user_ids[target],
+                    "created_at": base + timedelta(seconds=rng.random() * span),
+                }
+                for follower, target in chunk
+            ])
+    engine.dispose()
+
+    timeline_entries = asyncio.run(_backfill_timelines()) if args.timelines else 0
+    return {
+        "database": engine.dialect.name,
+        "seed": args.seed,
+        "users": args.users,
+        "posts": args.posts,
+        "published": sum(published),
+        "follows": len(follows),
+        "max_followers": max(followers, default=0),
+        "median_followers": sorted(followers)[len(followers) // 2] if followers else 0,
+        "timeline_entries": timeline_entries,
+        "password": PASSWORD,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+async def _backfill_timelines() -> int:
+    from app.core import timeline
+    from app.core.database import SessionLocal, dispose_engine, get_engine
+
+    get_engine()
+    try:
+        async with SessionLocal() as db:
+            return await timeline.backfill(db)
+    finally:
+        await dispose_engine()
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    p.add_argument("--users", type=int, default=10_000)
+    p.add_argument("--posts", type=int, default=100_000)
+    p.add_argument("--mean-follows", type=float, default=20)
+    p.add_argument("--follow-alpha", type=float, default=2.0, help="Pareto shape of following counts (> 1)")
+    p.add_argument("--follow-skew", type=float, default=1.0, help="Zipf exponent of follower popularity")
+    p.add_argument("--author-skew", type=float, default=0.8, help="Zipf exponent of posts per author")
+    p.add_argument("--draft-ratio", type=float, default=0.05)
+    p.add_argument("--body-words", type=int, default=150)
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.add_argument("--search", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--timelines", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--seed", type=int, default=0)
+    return p
+
+
+def main() -> None:
+    args = parser().parse_args()
+    args.database_url = os.environ.get("DATABASE_URL") or "sqlite:///./bench.db"
+    os.environ["DATABASE_URL"] = args.database_url
+    print(json.dumps(seed(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
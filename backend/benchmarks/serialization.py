@@ -0,0 +1,107 @@
+"""Cost of turning one page of posts into response bytes, old path vs. new.
+
+``orm_pydantic`` is the path before app/core/serializers.py: load ``Post``
+objects with ``joinedload(Post.author)``, build ``PostResponse``/``PostAuthor``
+by hand, validate the list again against the response model (as FastAPI does
+for ``response_model``) and encode it. ``rows_orjson`` selects the response
+columns as rows, builds dicts and renders them with orjson::
+
+    python -m benchmarks.serialization --page 100 --rounds 200
+
+Prints one JSON object with the mean time per page for each path, split into
+query+hydration and serialization, plus the speedup.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def timed(fn, rounds: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session, joinedload
+
+    from app.core.serializers import dumps, post_dicts, post_rows
+    from app.models import Post
+    from app.schemas.post import PostAuthor, PostResponse
+    from benchmarks.async_vs_sync import seed
+
+    seed(url, users=50, posts=args.page)
+    engine = create_engine(url)
+    session = Session(engine)
+    response_adapter = TypeAdapter(list[PostResponse])
+
+    def to_response(post: Post) -> PostResponse:
+        return PostResponse(
+            id=post.id,
+            author_id=post.author_id,
+            author=PostAuthor(
+                id=post.author.id,
+                username=post.author.username,
+                display_name=post.author.display_name,
+                avatar_url=post.author.avatar_url,
+            ),
+            title=post.title,
+            slug=post.slug,
+            body=post.body,
+            body_format=post.body_format,
+            cover_image_url=post.cover_image_url,
+            published_at=post.published_at,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+        )
+
+    def load_orm():
+        session.expunge_all()
+        return session.scalars(select(Post).options(joinedload(Post.author)).limit(args.page)).all()
+
+    def load_rows():
+        return session.execute(post_rows("full").limit(args.page)).all()
+
+    posts, rows = load_orm(), load_rows()
+
+    def serialize_orm():
+        validated = response_adapter.validate_python([to_response(p) for p in posts])
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def serialize_rows():
+        return dumps(post_dicts(rows))
+
+    assert json.loads(serialize_orm()) == json.loads(serialize_rows())
+    before = {"query_ms": timed(load_orm, args.rounds), "serialize_ms": timed(serialize_orm, args.rounds)}
+    after = {"query_ms": timed(load_rows, args.rounds), "serialize_ms": timed(serialize_rows, args.rounds)}
+    for result in (before, after):
+        result["total_ms"] = result["query_ms"] + result["serialize_ms"]
+    session.close()
+    engine.dispose()
+
+    print(json.dumps({
+        "page_size": args.page,
+        "orm_pydantic": {k: round(v, 3) for k, v in before.items()},
+        "rows_orjson": {k: round(v, 3) for k, v in after.items()},
+        "serialize_speedup": round(before["serialize_ms"] / after["serialize_ms"], 1),
+        "total_speedup": round(before["total_ms"] / after["total_ms"], 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Import-to-first-request time of a fresh worker process.
+
+Migrates a SQLite file once, then starts ``--runs`` new interpreters that each
+import ``app.main``, run the lifespan startup and serve one anonymous
+``GET /api/v1/posts`` in-process::
+
+    python -m benchmarks.startup --runs 10
+
+Prints one JSON object with the median of each phase in milliseconds and the
+heavy modules (bcrypt, jose, drivers) that were still unloaded when the first
+response went out.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from app.main import create_app
+imported = time.perf_counter()
+app = create_app()
+built = time.perf_counter()
+
+async def main():
+    import httpx
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/api/v1/posts")
+        assert response.status_code == 200, response.text
+        served = time.perf_counter()
+    return ready, served
+
+ready, served = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (built - imported) * 1000,
+    "startup_ms": (ready - built) * 1000,
+    "first_request_ms": (served - ready) * 1000,
+    "total_ms": (served - start) * 1000,
+    "deferred": sorted(m for m in %r if m not in sys.modules),
+}))
+"""
+HEAVY = ("passlib", "bcrypt", "jose", "aiosqlite", "asyncpg", "alembic")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    env.pop("AUTO_MIGRATE", None)
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD % (HEAVY,)], env=env, check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(out.splitlines()[-1]))
+
+    phases = ("import_ms", "create_app_ms", "startup_ms", "first_request_ms", "total_ms")
+    print(json.dumps({
+        "runs": args.runs,
+        **{phase: round(statistics.median(r[phase] for r in runs), 1) for phase in phases},
+        "deferred_modules": runs[-1]["deferred"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
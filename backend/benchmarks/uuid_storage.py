@@ -0,0 +1,157 @@
+"""On-disk size and lookup/join speed of 16-byte BLOB UUID keys vs. 36-char text keys.
+
+Seeds one SQLite file through the models (binary keys), copies it and rewrites
+every key column back to its 36-character text form (the pre-0002 layout), then
+VACUUMs both and compares them::
+
+    python -m benchmarks.uuid_storage --users 2000 --posts 50000 --follows 20
+
+Prints one JSON object with per-table/index sizes from ``dbstat`` and timings
+for primary-key lookups, the posts/users join and a timeline page query.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+GUID_COLUMNS = {
+    "users": ["id"],
+    "posts": ["id", "author_id"],
+    "follows": ["follower_id", "following_id"],
+    "timeline_entries": ["user_id", "post_id", "author_id"],
+}
+
+
+def seed(url: str, users: int, posts: int, follows: int) -> None:
+    from sqlalchemy import create_engine, insert, select
+
+    from app.core.database import Base
+    from app.models import Follow, Post, TimelineEntry, User
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": uid, "email": f"user{i}@example.com", "hashed_password": "x", "username": f"user{i}"}
+            for i, uid in enumerate(user_ids)
+        ])
+        conn.execute(insert(Post), [
+            {
+                "author_id": user_ids[i % users],
+                "title": f"Post {i}",
+                "slug": f"post-{i}",
+                "body": "lorem ipsum",
+                "published_at": now - timedelta(minutes=i),
+            }
+            for i in range(posts)
+        ])
+        conn.execute(insert(Follow), [
+            {"follower_id": uid, "following_id": author}
+            for uid in user_ids
+            for author in rng.sample([a for a in user_ids if a != uid], min(follows, users - 1))
+        ])
+        rows = select(Follow.follower_id, Post.id, Post.author_id, Post.published_at).join(
+            Post, Post.author_id == Follow.following_id
+        )
+        conn.execute(
+            insert(TimelineEntry).from_select(["user_id", "post_id", "author_id", "published_at"], rows)
+        )
+    engine.dispose()
+
+
+def to_text_keys(path: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.create_function("uuid_text", 1, lambda v: str(uuid.UUID(bytes=v)), deterministic=True)
+    for table, columns in GUID_COLUMNS.items():
+        conn.execute(f"UPDATE {table} SET {', '.join(f'{c} = uuid_text({c})' for c in columns)}")
+    conn.commit()
+    conn.close()
+
+
+def sizes(conn: sqlite3.Connection) -> dict:
+    rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY name").fetchall()
+    result = {name: size for name, size in rows if not name.startswith("sqlite_master")}
+    result["total"] = sum(result.values())
+    return result
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) * 1000 / repeat, 3)
+
+
+def measure(path: str, lookups: int) -> dict:
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    post_ids = [r[0] for r in conn.execute("SELECT id FROM posts ORDER BY random() LIMIT ?", (lookups,))]
+    user_ids = [r[0] for r in conn.execute("SELECT id FROM users ORDER BY random() LIMIT 100")]
+
+    def lookup():
+        for pid in post_ids:
+            conn.execute("SELECT title FROM posts WHERE id = ?", (pid,)).fetchone()
+
+    def join():
+        conn.execute("SELECT count(users.username) FROM posts JOIN users ON users.id = posts.author_id").fetchone()
+
+    def timeline():
+        for uid in user_ids:
+            conn.execute(
+                "SELECT posts.title, users.username FROM timeline_entries "
+                "JOIN posts ON posts.id = timeline_entries.post_id "
+                "JOIN users ON users.id = posts.author_id "
+                "WHERE timeline_entries.user_id = ? "
+                "ORDER BY timeline_entries.published_at DESC, timeline_entries.post_id DESC LIMIT 20",
+                (uid,),
+            ).fetchall()
+
+    result = {
+        "bytes": sizes(conn),
+        "pk_lookup_ms_per_batch": timed(lookup, 5),
+        "posts_users_join_ms": timed(join, 5),
+        "timeline_pages_ms_per_100": timed(timeline, 5),
+    }
+    conn.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.uuid_storage")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--follows", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    binary_path = os.path.join(tmp, "binary.db")
+    text_path = os.path.join(tmp, "text.db")
+    seed(f"sqlite:///{binary_path}", args.users, args.posts, args.follows)
+    shutil.copyfile(binary_path, text_path)
+    to_text_keys(text_path)
+
+    text = measure(text_path, args.lookups)
+    binary = measure(binary_path, args.lookups)
+    result = {
+        "dataset": {"users": args.users, "posts": args.posts, "follows_per_user": args.follows},
+        "text_36": text,
+        "binary_16": binary,
+        "size_ratio": round(binary["bytes"]["total"] / text["bytes"]["total"], 3),
+    }
+    print(json.dumps(result, indent=2))
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
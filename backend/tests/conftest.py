@@ -0,0 +1,45 @@
+"""Shared fixtures: an app on a fresh, migrated SQLite file per test."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core import cache, database
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'folio.db'}")
+    monkeypatch.setattr(settings, "auto_migrate", True)
+    monkeypatch.setattr(settings, "view_tracking_enabled", False)
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(cache.response_cache, "backend", cache.MemoryCacheBackend(max_entries=1000))
+    from app.core.security import password_hasher
+    from app.main import create_app
+
+    monkeypatch.setattr(password_hasher, "workers", 0)
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def signup(client):
+    """``signup("name")`` registers a user and returns ``(user_id, auth_headers)``."""
+
+    def signup(username: str) -> tuple[str, dict[str, str]]:
+        r = client.post(
+            f"{API}/auth/register",
+            json={"email": f"{username}@example.com", "password": "pw", "username": username},
+        )
+        assert r.status_code == 200, r.text
+        body = r.json()
+        return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+
+    return signup
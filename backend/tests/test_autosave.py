@@ -0,0 +1,86 @@
+"""Delta autosave for drafts: revisions, no-op saves, conflicts and history reconstruction."""
+import time
+
+from app.config import settings
+
+API = "/api/v1"
+
+
+def _draft(client, headers, body: str = "hello") -> dict:
+    return client.post(f"{API}/posts", json={"title": "Draft", "body": body}, headers=headers).json()
+
+
+def _save(client, headers, post_id: str, base: int, ops: list):
+    return client.patch(f"{API}/posts/{post_id}/body", json={"base_revision": base, "ops": ops}, headers=headers)
+
+
+def test_autosave_applies_ops_and_bumps_the_revision(client, signup):
+    _, headers = signup("author")
+    post = _draft(client, headers)
+
+    r = _save(client, headers, post["id"], 1, [5, " world"])
+    assert r.status_code == 200
+    assert r.json()["revision"] == 2
+    got = client.get(f"{API}/posts/{post['id']}", headers=headers).json()
+    assert (got["body"], got["revision"]) == ("hello world", 2)
+
+
+def test_no_op_autosaves_save_nothing(client, signup):
+    _, headers = signup("author")
+    post = _draft(client, headers)
+    saved = _save(client, headers, post["id"], 1, [1, "x"]).json()
+    etag = client.get(f"{API}/posts/{post['id']}", headers=headers).headers["ETag"]
+
+    for ops in ([], [3], [6], ["", 2], [2, "e", -1]):
+        r = _save(client, headers, post["id"], 2, ops)
+        assert r.status_code == 200, ops
+        assert r.json() == saved
+
+    assert client.get(f"{API}/posts/{post['id']}", headers={**headers, "If-None-Match": etag}).status_code == 304
+    history = client.get(f"{API}/posts/{post['id']}/revisions", headers=headers).json()
+    assert [entry["revision"] for entry in history] == [2, 1]
+
+
+def test_stale_base_and_bad_ops_are_rejected(client, signup):
+    _, headers = signup("author")
+    _, other = signup("other")
+    post = _draft(client, headers)
+    _save(client, headers, post["id"], 1, ["a"])
+
+    assert _save(client, headers, post["id"], 1, ["b"]).status_code == 409
+    assert _save(client, headers, post["id"], 2, [100]).status_code == 422
+    assert _save(client, other, post["id"], 2, ["b"]).status_code == 403
+    client.patch(f"{API}/posts/{post['id']}", json={"published": True}, headers=headers)
+    assert _save(client, headers, post["id"], 2, ["b"]).status_code == 409
+
+
+def test_every_revision_can_be_rebuilt(client, signup, monkeypatch):
+    monkeypatch.setattr(settings, "revision_snapshot_interval", 3)
+    _, headers = signup("author")
+    post = _draft(client, headers, "start")
+    bodies, body = {1: "start"}, "start"
+    for i in range(8):
+        if i == 4:
+            body = "replaced"
+            r = client.patch(f"{API}/posts/{post['id']}", json={"body": body}, headers=headers)
+            revision = r.json()["revision"]
+        else:
+            revision = _save(client, headers, post["id"], len(bodies), [len(body), f" {i}"]).json()["revision"]
+            body += f" {i}"
+        bodies[revision] = body
+
+    for revision, expected in bodies.items():
+        r = client.get(f"{API}/posts/{post['id']}/revisions/{revision}", headers=headers)
+        assert r.json()["body"] == expected, revision
+
+
+def test_autosave_moves_last_modified(client, signup):
+    _, headers = signup("author")
+    post = _draft(client, headers)
+    last_modified = client.get(f"{API}/posts/{post['id']}", headers=headers).headers["Last-Modified"]
+
+    time.sleep(1.01 - time.time() % 1)
+    _save(client, headers, post["id"], 1, [5, "!"])
+    r = client.get(f"{API}/posts/{post['id']}", headers={**headers, "If-Modified-Since": last_modified})
+    assert r.status_code == 200
+    assert r.json()["body"] == "hello!"
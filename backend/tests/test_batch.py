@@ -0,0 +1,44 @@
+"""``/batch`` lookups answer in request order and report what they couldn't return."""
+import uuid
+
+from app.config import settings
+
+API = "/api/v1"
+
+
+def test_posts_come_back_in_request_order(client, signup):
+    _, author = signup("author")
+    _, other = signup("other")
+    a, b, c = (
+        client.post(f"{API}/posts", json={"title": t, "body": "x", "published": True}, headers=author).json()["id"]
+        for t in "abc"
+    )
+    draft = client.post(f"{API}/posts", json={"title": "d", "body": "x"}, headers=author).json()["id"]
+    unknown = str(uuid.uuid4())
+
+    r = client.get(f"{API}/posts/batch", params={"ids": [f"{c},{a}", "bogus", unknown, draft, b, a]}, headers=other)
+    assert r.status_code == 200
+    assert [post["id"] for post in r.json()["items"]] == [c, a, b]
+    assert r.json()["missing"] == ["bogus", unknown, draft]
+
+    r = client.get(f"{API}/posts/batch", params={"ids": f"{draft},{b}", "fields": "summary"}, headers=author)
+    assert [post["id"] for post in r.json()["items"]] == [draft, b]
+    assert "body" not in r.json()["items"][0]
+
+
+def test_users_by_id_and_username_come_back_in_request_order(client, signup):
+    ann, _ = signup("ann")
+    bob, _ = signup("bob")
+
+    r = client.get(f"{API}/users/batch", params={"ids": f"{bob},nope,{ann}"})
+    assert [user["id"] for user in r.json()["items"]] == [bob, ann]
+    assert r.json()["missing"] == ["nope"]
+
+    r = client.get(f"{API}/users/batch/by-username", params={"usernames": ["bob", "carl", "ann"]})
+    assert [user["username"] for user in r.json()["items"]] == ["bob", "ann"]
+    assert r.json()["missing"] == ["carl"]
+
+
+def test_too_many_keys_is_a_422(client, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_keys", 2)
+    assert client.get(f"{API}/users/batch/by-username", params={"usernames": "a,b,c"}).status_code == 422
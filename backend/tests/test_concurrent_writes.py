@@ -0,0 +1,41 @@
+"""Concurrent writes against a file-backed SQLite database (``python -m pytest tests`` from ``backend/``).
+
+A deferred ``BEGIN`` lets a transaction read first and take the write lock
+later; under concurrency that upgrade fails at once with "database is
+locked" (busy_timeout doesn't cover it), so most of a burst of creates 500s.
+"""
+import asyncio
+
+import httpx
+
+API = "/api/v1"
+WRITERS = 40
+
+
+async def _burst(app) -> list[int]:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            tokens = []
+            for i in range(4):
+                r = await client.post(
+                    f"{API}/auth/register",
+                    json={"email": f"w{i}@example.com", "password": "pw", "username": f"w{i}"},
+                )
+                assert r.status_code == 200, r.text
+                tokens.append(r.json()["access_token"])
+
+            async def create(i: int) -> int:
+                r = await client.post(
+                    f"{API}/posts",
+                    json={"title": "Same title", "body": f"post {i}", "published": True},
+                    headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"},
+                )
+                return r.status_code
+
+            return await asyncio.gather(*(create(i) for i in range(WRITERS)))
+
+
+def test_concurrent_post_creates_all_succeed(app):
+    statuses = asyncio.run(_burst(app))
+    assert statuses == [200] * WRITERS
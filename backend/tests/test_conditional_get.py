@@ -0,0 +1,81 @@
+"""ETag / Last-Modified on post reads: 304s while unchanged, 200s once anything in the response moves."""
+import time
+
+API = "/api/v1"
+
+
+def _next_second():
+    """Last-Modified has one-second resolution; make the next write land in a later second."""
+    time.sleep(1.01 - time.time() % 1)
+
+
+def _post(client, headers, **fields):
+    data = {"title": "Title", "body": "text", "published": True, **fields}
+    return client.post(f"{API}/posts", json=data, headers=headers).json()
+
+
+def test_if_none_match_is_304_until_the_post_changes(client, signup):
+    _, headers = signup("author")
+    post = _post(client, headers)
+    path = f"{API}/posts/{post['id']}"
+    etag = client.get(path).headers["ETag"]
+
+    r = client.get(path, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert client.get(path, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+    client.patch(path, json={"title": "Edited"}, headers=headers)
+    r = client.get(path, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["title"] == "Edited"
+
+
+def test_if_modified_since_follows_edits(client, signup):
+    _, headers = signup("author")
+    post = _post(client, headers)
+    path = f"{API}/posts/slug/{post['slug']}"
+    last_modified = client.get(path).headers["Last-Modified"]
+    assert client.get(path, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    _next_second()
+    client.patch(f"{API}/posts/{post['id']}", json={"body": "edited"}, headers=headers)
+    r = client.get(path, headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 200
+    assert r.json()["body"] == "edited"
+
+
+def test_author_profile_change_revalidates_their_posts(client, signup):
+    _, headers = signup("author")
+    post = _post(client, headers)
+    path = f"{API}/posts/{post['id']}"
+    first = client.get(path).headers
+
+    _next_second()
+    client.patch(f"{API}/users/me", json={"display_name": "Renamed"}, headers=headers)
+    assert client.get(path, headers={"If-None-Match": first["ETag"]}).status_code == 200
+    assert client.get(path, headers={"If-Modified-Since": first["Last-Modified"]}).status_code == 200
+
+
+def test_html_and_markdown_representations_have_distinct_etags(client, signup):
+    _, headers = signup("author")
+    post = _post(client, headers, body="*hi*")
+    path = f"{API}/posts/{post['id']}"
+    markdown = client.get(path).headers["ETag"]
+    html = client.get(path, params={"fields": "html"})
+
+    assert html.headers["ETag"] != markdown
+    assert client.get(path, params={"fields": "html"}, headers={"If-None-Match": markdown}).status_code == 200
+
+
+def test_drafts_are_private_and_hidden_from_others(client, signup):
+    _, headers = signup("author")
+    _, other = signup("other")
+    draft = _post(client, headers, published=False)
+    path = f"{API}/posts/{draft['id']}"
+    r = client.get(path, headers=headers)
+    assert r.headers["Cache-Control"] == "private, no-cache"
+
+    # A matching validator mustn't reveal that the draft exists.
+    assert client.get(path, headers={**other, "If-None-Match": r.headers["ETag"]}).status_code == 404
+    assert client.get(path, headers={"If-None-Match": r.headers["ETag"]}).status_code == 404
@@ -0,0 +1,66 @@
+"""Stored follower/following/post counters and the profile validators that cover them."""
+import time
+
+API = "/api/v1"
+
+
+def _next_second():
+    """Last-Modified has one-second resolution; make the next write land in a later second."""
+    time.sleep(1.01 - time.time() % 1)
+
+
+def _counts(client, user_id: str) -> tuple[int, int, int]:
+    user = client.get(f"{API}/users/{user_id}").json()
+    return user["follower_count"], user["following_count"], user["post_count"]
+
+
+def test_counters_follow_follows_and_publishing(client, signup):
+    ann_id, ann = signup("ann")
+    bob_id, bob = signup("bob")
+
+    assert client.post(f"{API}/users/me/follow/{bob_id}", headers=ann).status_code == 204
+    assert client.post(f"{API}/users/me/follow/{bob_id}", headers=ann).status_code == 204  # already following
+    assert _counts(client, ann_id) == (0, 1, 0)
+    assert _counts(client, bob_id) == (1, 0, 0)
+
+    post = client.post(f"{API}/posts", json={"title": "t", "body": "x"}, headers=bob).json()
+    assert _counts(client, bob_id) == (1, 0, 0)  # drafts don't count
+    client.patch(f"{API}/posts/{post['id']}", json={"published": True}, headers=bob)
+    assert _counts(client, bob_id) == (1, 0, 1)
+    client.delete(f"{API}/posts/{post['id']}", headers=bob)
+    assert _counts(client, bob_id) == (1, 0, 0)
+
+    assert client.delete(f"{API}/users/me/follow/{bob_id}", headers=ann).status_code == 204
+    assert client.delete(f"{API}/users/me/follow/{bob_id}", headers=ann).status_code == 204  # not following
+    assert _counts(client, ann_id) == (0, 0, 0)
+    assert _counts(client, bob_id) == (0, 0, 0)
+
+
+def test_unfollow_revalidates_profiles_by_etag_and_date(client, signup):
+    ann_id, ann = signup("ann")
+    bob_id, _ = signup("bob")
+    client.post(f"{API}/users/me/follow/{bob_id}", headers=ann)
+    paths = [f"{API}/users/{bob_id}", f"{API}/users/by-username/bob", f"{API}/users/{ann_id}"]
+    before = {path: client.get(path).headers for path in paths}
+    for path, headers in before.items():
+        assert client.get(path, headers={"If-Modified-Since": headers["Last-Modified"]}).status_code == 304
+        assert client.get(path, headers={"If-None-Match": headers["ETag"]}).status_code == 304
+
+    _next_second()
+    client.delete(f"{API}/users/me/follow/{bob_id}", headers=ann)
+
+    for path, headers in before.items():
+        r = client.get(path, headers={"If-Modified-Since": headers["Last-Modified"]})
+        assert r.status_code == 200, path
+        assert client.get(path, headers={"If-None-Match": headers["ETag"]}).status_code == 200
+        assert client.get(path, headers={"If-Modified-Since": r.headers["Last-Modified"]}).status_code == 304
+
+
+def test_follower_change_leaves_post_validators_alone(client, signup):
+    ann_id, ann = signup("ann")
+    _, bob = signup("bob")
+    post = client.post(f"{API}/posts", json={"title": "t", "body": "x", "published": True}, headers=ann).json()
+    etag = client.get(f"{API}/posts/{post['id']}").headers["ETag"]
+
+    client.post(f"{API}/users/me/follow/{ann_id}", headers=bob)
+    assert client.get(f"{API}/posts/{post['id']}", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,48 @@
+"""``GET /users/me/export``: every record of the caller's, tagged by type, plain or gzipped."""
+import gzip
+
+import orjson
+
+API = "/api/v1"
+
+
+def _records(content: bytes) -> list[dict]:
+    return [orjson.loads(line) for line in content.splitlines()]
+
+
+def test_export_has_profile_posts_and_follows(client, signup):
+    ann_id, ann = signup("ann")
+    bob_id, bob = signup("bob")
+    carl_id, _ = signup("carl")
+    client.post(f"{API}/users/me/follow/{carl_id}", headers=ann)
+    client.post(f"{API}/users/me/follow/{ann_id}", headers=bob)
+    client.post(f"{API}/posts", json={"title": "Draft", "body": "d"}, headers=ann)
+    client.post(f"{API}/posts", json={"title": "Live", "body": "l", "published": True}, headers=ann)
+    client.post(f"{API}/posts", json={"title": "Not mine", "body": "x", "published": True}, headers=bob)
+
+    r = client.get(f"{API}/users/me/export", headers=ann)
+
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert r.headers["content-disposition"].startswith('attachment; filename="folio-ann-')
+    records = _records(r.content)
+    assert [record["type"] for record in records] == ["export", "profile", "post", "post", "following", "follower"]
+    assert records[1]["id"] == ann_id
+    assert {record["title"]: record["body"] for record in records[2:4]} == {"Draft": "d", "Live": "l"}
+    assert (records[4]["id"], records[5]["id"]) == (carl_id, bob_id)
+
+
+def test_compressed_export_is_the_same_stream(client, signup):
+    _, headers = signup("ann")
+    client.post(f"{API}/posts", json={"title": "Post", "body": "x"}, headers=headers)
+    plain = _records(client.get(f"{API}/users/me/export", headers=headers).content)
+
+    r = client.get(f"{API}/users/me/export", params={"compress": True}, headers=headers)
+
+    assert r.headers["content-type"] == "application/gzip"
+    assert r.headers["content-disposition"].endswith('.ndjson.gz"')
+    compressed = _records(gzip.decompress(r.content))
+    assert [record for record in compressed if record["type"] != "export"] == plain[1:]
+
+
+def test_export_needs_a_login(client):
+    assert client.get(f"{API}/users/me/export").status_code == 401
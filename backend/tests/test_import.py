@@ -0,0 +1,82 @@
+"""Bulk import: per-item results in upload order, batching, and importing an export file."""
+import io
+import zipfile
+
+import orjson
+
+from app.config import settings
+
+API = "/api/v1"
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _import(client, headers, content: bytes, content_type: dict = NDJSON) -> list[dict]:
+    r = client.post(f"{API}/posts/import", content=content, headers={**headers, **content_type})
+    assert r.status_code == 200, r.text
+    return [orjson.loads(line) for line in r.content.splitlines()]
+
+
+def test_results_come_back_in_upload_order(client, signup, monkeypatch):
+    monkeypatch.setattr(settings, "import_batch_size", 3)
+    _, headers = signup("author")
+    upload = b"\n".join([
+        orjson.dumps({"title": "one", "body": "x"}),
+        b"{not json",
+        orjson.dumps({"title": "three", "body": "x"}),
+        orjson.dumps({"body": "no title"}),
+        b"",
+        orjson.dumps({"title": "six", "body": "x", "published": True}),
+        b"[1, 2]",
+    ])
+
+    lines = _import(client, headers, upload)
+
+    items = [(line["source"], line["status"]) for line in lines if line["type"] == "item"]
+    assert items == [
+        ("line 1", "created"), ("line 2", "error"), ("line 3", "created"),
+        ("line 4", "error"), ("line 6", "created"), ("line 7", "error"),
+    ]
+    assert [line["type"] for line in lines].count("progress") == 2
+    assert lines[-1] == {"type": "summary", "created": 3, "failed": 3}
+    assert [post["title"] for post in client.get(f"{API}/posts").json()] == ["six"]
+
+
+def test_import_max_posts_is_reported_per_item(client, signup, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_posts", 2)
+    _, headers = signup("author")
+    upload = b"".join(orjson.dumps({"title": f"p{i}", "body": "x"}) + b"\n" for i in range(3))
+
+    lines = _import(client, headers, upload)
+
+    assert [line.get("error") for line in lines if line["type"] == "item"] == [None, None, "import_max_posts reached"]
+
+
+def test_zip_of_markdown_files(client, signup):
+    _, headers = signup("author")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.md", "---\ntitle: From front matter\ndate: 2020-01-02\n---\nbody")
+        zf.writestr("b.markdown", "# From heading\n\ntext")
+        zf.writestr("notes.txt", "skipped")
+
+    lines = _import(client, headers, archive.getvalue(), {"Content-Type": "application/zip"})
+
+    items = [line for line in lines if line["type"] == "item"]
+    assert [(item["source"], item["status"]) for item in items] == [("a.md", "created"), ("b.markdown", "created")]
+    dated, undated = (client.get(f"{API}/posts/{item['id']}", headers=headers).json() for item in items)
+    assert (dated["title"], dated["published_at"][:10]) == ("From front matter", "2020-01-02")
+    assert (undated["title"], undated["published_at"]) == ("From heading", None)
+
+
+def test_an_export_file_imports_as_is(client, signup):
+    _, source = signup("source")
+    _, target = signup("target")
+    client.post(f"{API}/posts", json={"title": "Published", "body": "x", "published": True}, headers=source)
+    client.post(f"{API}/posts", json={"title": "Draft", "body": "y"}, headers=source)
+    export = client.get(f"{API}/users/me/export", headers=source).content
+
+    lines = _import(client, target, export)
+
+    assert lines[-1] == {"type": "summary", "created": 2, "failed": 0}
+    me = client.get(f"{API}/users/me", headers=target).json()
+    assert me["post_count"] == 1
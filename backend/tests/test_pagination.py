@@ -0,0 +1,48 @@
+"""Keyset (cursor) paging of post lists and the home timeline."""
+API = "/api/v1"
+
+
+def _pages(client, path: str, limit: int, headers=None) -> list[list[str]]:
+    pages, params = [], {"limit": limit}
+    while True:
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == 200, r.text
+        pages.append([post["id"] for post in r.json()])
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        params = {"limit": limit, "cursor": cursor}
+
+
+def _publish(client, headers, count: int) -> list[str]:
+    ids = []
+    for i in range(count):
+        r = client.post(f"{API}/posts", json={"title": f"Post {i}", "body": "text", "published": True}, headers=headers)
+        ids.append(r.json()["id"])
+    return ids
+
+
+def test_cursor_pages_cover_the_list_newest_first(client, signup):
+    _, headers = signup("author")
+    ids = _publish(client, headers, 7)
+    client.post(f"{API}/posts", json={"title": "Draft", "body": "text"}, headers=headers)
+
+    pages = _pages(client, f"{API}/posts", limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [post_id for page in pages for post_id in page] == ids[::-1]
+
+
+def test_cursor_pages_the_home_timeline(client, signup):
+    author_id, author = signup("author")
+    _, reader = signup("reader")
+    assert client.post(f"{API}/users/me/follow/{author_id}", headers=reader).status_code == 204
+    ids = _publish(client, author, 5)
+
+    pages = _pages(client, f"{API}/feed", limit=2, headers=reader)
+
+    assert [post_id for page in pages for post_id in page] == ids[::-1]
+
+
+def test_malformed_cursor_is_a_400(client):
+    assert client.get(f"{API}/posts", params={"cursor": "not-a-cursor"}).status_code == 400
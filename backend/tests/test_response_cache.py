@@ -0,0 +1,62 @@
+"""Serialized-response cache: hits, tag invalidation on writes, and the backend interface."""
+import pytest
+
+from app.core.cache import CacheBackend
+
+API = "/api/v1"
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoCounters(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl, size=1):
+            pass
+
+        def delete(self, key):
+            pass
+
+    with pytest.raises(TypeError):
+        NoCounters()
+
+
+def test_list_is_served_from_cache_until_a_post_is_published(client, signup):
+    _, headers = signup("author")
+    client.post(f"{API}/posts", json={"title": "First", "body": "text", "published": True}, headers=headers)
+
+    assert client.get(f"{API}/posts").headers["X-Cache"] == "MISS"
+    assert client.get(f"{API}/posts").headers["X-Cache"] == "HIT"
+
+    client.post(f"{API}/posts", json={"title": "Second", "body": "text", "published": True}, headers=headers)
+    r = client.get(f"{API}/posts")
+    assert r.headers["X-Cache"] == "MISS"
+    assert [post["title"] for post in r.json()] == ["Second", "First"]
+
+
+def test_post_edit_and_author_rename_invalidate_cached_reads(client, signup):
+    _, headers = signup("author")
+    post = client.post(f"{API}/posts", json={"title": "Old", "body": "text", "published": True}, headers=headers).json()
+    path = f"{API}/posts/slug/{post['slug']}"
+    client.get(path)
+    assert client.get(path).headers["X-Cache"] == "HIT"
+
+    client.patch(f"{API}/posts/{post['id']}", json={"title": "New"}, headers=headers)
+    r = client.get(path)
+    assert (r.headers["X-Cache"], r.json()["title"]) == ("MISS", "New")
+
+    client.patch(f"{API}/users/me", json={"display_name": "Renamed"}, headers=headers)
+    r = client.get(path)
+    assert (r.headers["X-Cache"], r.json()["author"]["display_name"]) == ("MISS", "Renamed")
+    assert client.get(f"{API}/posts").json()[0]["author"]["display_name"] == "Renamed"
+
+
+def test_deleted_post_leaves_the_cached_list(client, signup):
+    _, headers = signup("author")
+    data = {"title": "Gone", "body": "text", "published": True}
+    post = client.post(f"{API}/posts", json=data, headers=headers).json()
+    assert len(client.get(f"{API}/posts").json()) == 1
+
+    assert client.delete(f"{API}/posts/{post['id']}", headers=headers).status_code == 204
+    assert client.get(f"{API}/posts").json() == []
+    assert client.get(f"{API}/posts/slug/{post['slug']}").status_code == 404
@@ -0,0 +1,36 @@
+"""Slug allocation: numbered copies continue from the highest numeric suffix, per post and per import batch."""
+import orjson
+
+from app.config import settings
+
+API = "/api/v1"
+
+
+def _slug(client, headers, title: str) -> str:
+    return client.post(f"{API}/posts", json={"title": title, "body": "x"}, headers=headers).json()["slug"]
+
+
+def test_numbered_copies_ignore_other_slugs_with_the_same_prefix(client, signup):
+    _, headers = signup("author")
+    slugs = [_slug(client, headers, t) for t in ("The", "The", "The end", "The 2nd try", "The 7", "The")]
+    assert slugs == ["the", "the-1", "the-end", "the-2nd-try", "the-7", "the-8"]
+
+
+def test_too_many_numbered_copies_fall_back_to_a_random_suffix(client, signup, monkeypatch):
+    monkeypatch.setattr(settings, "slug_max_numeric_suffix", 2)
+    _, headers = signup("author")
+    slugs = [_slug(client, headers, "Again") for _ in range(4)]
+    assert slugs[:3] == ["again", "again-1", "again-2"]
+    prefix, _, suffix = slugs[3].rpartition("-")
+    assert prefix == "again" and len(suffix) == 6 and slugs[3] not in slugs[:3]
+
+
+def test_import_batch_allocates_distinct_slugs(client, signup):
+    _, headers = signup("author")
+    _slug(client, headers, "Hello")
+    _slug(client, headers, "Hello world")
+    lines = b"".join(orjson.dumps({"title": t, "body": "x"}) + b"\n" for t in ("Hello", "Fresh", "Hello", "Fresh"))
+
+    r = client.post(f"{API}/posts/import", content=lines, headers={**headers, "Content-Type": "application/x-ndjson"})
+    items = [orjson.loads(line) for line in r.content.splitlines()]
+    assert [item["slug"] for item in items if item["type"] == "item"] == ["hello-1", "fresh", "hello-2", "fresh-1"]
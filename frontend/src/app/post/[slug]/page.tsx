@@ -23,7 +23,7 @@ export default function PostPage() {
   useEffect(() => {
     if (!slug) return;
     api.posts
-      .getBySlug(slug)
+      .getBySlug(slug, "html")
       .then(setPost)
       .catch((e) => setError(e.message))
       .finally(() => setLoading(false));
@@ -74,9 +74,16 @@ export default function PostPage() {
           className="mb-8 w-full rounded-lg object-cover"
         />
       )}
-      <div className="prose prose-zinc dark:prose-invert max-w-none whitespace-pre-wrap font-serif text-lg leading-relaxed text-zinc-700 dark:text-zinc-300">
-        {post.body}
-      </div>
+      {post.body_format === "html" ? (
+        <div
+          className="prose prose-zinc dark:prose-invert max-w-none font-serif text-lg leading-relaxed text-zinc-700 dark:text-zinc-300"
+          dangerouslySetInnerHTML={{ __html: post.body }}
+        />
+      ) : (
+        <div className="prose prose-zinc dark:prose-invert max-w-none whitespace-pre-wrap font-serif text-lg leading-relaxed text-zinc-700 dark:text-zinc-300">
+          {post.body}
+        </div>
+      )}
       <p className="mt-12">
         <Link href="/" className="text-sm text-zinc-600 underline dark:text-zinc-400">← Back to home</Link>
       </p>
@@ -42,6 +42,15 @@ async function getToken(): Promise<string | null> {
   return localStorage.getItem("token");
 }
 
+// Returned after our writes and sent back, so reads that follow see them even
+// when the API reads from replicas.
+const LAST_WRITE_HEADER = "X-Last-Write";
+
+function getLastWrite(): string | null {
+  if (typeof window === "undefined") return null;
+  return sessionStorage.getItem("lastWrite");
+}
+
 export async function request<T>(
   path: string,
   options: RequestInit = {}
@@ -53,8 +62,12 @@ export async function request<T>(
     ...(options.headers as Record<string, string>),
   };
   if (token) (headers as Record<string, string>)["Authorization"] = `Bearer ${token}`;
+  const lastWrite = getLastWrite();
+  if (lastWrite) (headers as Record<string, string>)[LAST_WRITE_HEADER] = lastWrite;
 
   const res = await fetch(url, { ...options, headers });
+  const marker = res.headers.get(LAST_WRITE_HEADER);
+  if (marker && typeof window !== "undefined") sessionStorage.setItem("lastWrite", marker);
   if (!res.ok) {
     const err = await res.json().catch(() => ({ detail: res.statusText }));
     const message =
@@ -94,7 +107,8 @@ export const api = {
       if (params?.limit != null) sp.set("limit", String(params.limit));
       return request<Post[]>(`/posts?${sp}`);
     },
-    getBySlug: (slug: string) => request<Post>(`/posts/slug/${slug}`),
+    getBySlug: (slug: string, fields?: "full" | "html") =>
+      request<Post>(`/posts/slug/${slug}${fields ? `?fields=${fields}` : ""}`),
     get: (id: string) => request<Post>(`/posts/${id}`),
     create: (data: { title: string; body: string; body_format?: string; cover_image_url?: string; published?: boolean }) =>
       request<Post>("/posts", { method: "POST", body: JSON.stringify(data) }),